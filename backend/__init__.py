@@ -0,0 +1 @@
+"""Portfolio backend API. Run it with `python -m backend`; the app lives in `server.py`."""
@@ -0,0 +1,115 @@
+"""Production launcher: `python -m backend --workers 4 --port 8001`.
+
+The parent process never imports server.py. Each worker imports the app
+itself, so the Mongo client and its pool are created after the fork and
+never shared across processes.
+"""
+
+import importlib.util
+import os
+import sys
+from enum import Enum
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+BACKEND_DIR = Path(__file__).resolve().parent
+APP_FACTORY = "server:create_app"
+
+cli = typer.Typer(add_completion=False)
+
+
+class ServerKind(str, Enum):
+    uvicorn = "uvicorn"
+    gunicorn = "gunicorn"
+
+
+def available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def run_gunicorn(options: dict):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise typer.BadParameter("gunicorn is not installed (pip install gunicorn)",
+                                 param_hint="--server")
+
+    def post_fork(server, worker):
+        server.log.info("Worker %s forked; it will open its own MongoDB client", worker.pid)
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+            self.cfg.set("post_fork", post_fork)
+
+        def load(self):
+            # preload_app is off, so this runs in each worker after the fork
+            from server import create_app
+            return create_app()
+
+    Application().run()
+
+
+@cli.command()
+def serve(
+    host: str = typer.Option("0.0.0.0", envvar="HOST"),
+    port: int = typer.Option(8001, envvar="PORT"),
+    workers: int = typer.Option(os.cpu_count() or 1, envvar="WEB_CONCURRENCY",
+                                help="Worker processes (default: CPU count)."),
+    server: ServerKind = typer.Option(ServerKind.uvicorn, help="Process manager to run the workers."),
+    keep_alive: int = typer.Option(5, help="Seconds to hold idle keep-alive connections."),
+    backlog: int = typer.Option(2048, help="Pending connections the socket queues."),
+    graceful_timeout: int = typer.Option(
+        30, help="Seconds in-flight requests get to finish on shutdown."),
+    limit_concurrency: Optional[int] = typer.Option(
+        None, help="Per-worker connection cap before answering 503."),
+    log_level: str = typer.Option("info"),
+):
+    """Serve the API with N workers, using uvloop/httptools when installed."""
+    loop = "uvloop" if available("uvloop") else "asyncio"
+    http = "httptools" if available("httptools") else "h11"
+    typer.echo(f"Starting {workers} {server.value} worker(s) on {host}:{port} "
+               f"(loop={loop}, http={http}, keep-alive={keep_alive}s, backlog={backlog})")
+    # Workers spawned by uvicorn re-import from here, so siblings of server.py resolve
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    if server is ServerKind.gunicorn:
+        run_gunicorn({
+            "bind": f"{host}:{port}",
+            "workers": workers,
+            "worker_class": "uvicorn.workers.UvicornWorker",
+            "keepalive": keep_alive,
+            "backlog": backlog,
+            "graceful_timeout": graceful_timeout,
+            "chdir": str(BACKEND_DIR),
+            "preload_app": False,
+            "loglevel": log_level,
+        })
+        return
+
+    import uvicorn
+    uvicorn.run(
+        APP_FACTORY,
+        factory=True,
+        app_dir=str(BACKEND_DIR),
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=keep_alive,
+        backlog=backlog,
+        timeout_graceful_shutdown=graceful_timeout,
+        limit_concurrency=limit_concurrency,
+        log_level=log_level,
+        # The app routes all logging through its own queue; its access log has request ids
+        log_config=None,
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    cli(prog_name="python -m backend")
@@ -0,0 +1,184 @@
+import csv
+import io
+from datetime import datetime
+
+import orjson
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+CHUNK_BYTES = 64 * 1024
+MAX_REPORTED_ERRORS = 100
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def export_ndjson(cursor):
+    """Encode documents as NDJSON, yielding roughly CHUNK_BYTES at a time."""
+    buffer = bytearray()
+    async for doc in cursor:
+        buffer += orjson.dumps(doc)
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def export_csv(cursor, fields):
+    """Encode documents as CSV with a header row, yielding roughly CHUNK_BYTES at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for doc in cursor:
+        writer.writerow([_csv_value(doc.get(field)) for field in fields])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def iter_lines(stream):
+    """Split a byte stream into (line number, text) pairs without buffering it whole."""
+    pending = b""
+    line_no = 0
+    async for chunk in stream:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.rstrip(b"\r").decode("utf-8", errors="replace")
+    if pending:
+        yield line_no + 1, pending.rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+async def iter_ndjson(stream):
+    """Yield (line number, record or None, error or None) for each non-blank NDJSON line."""
+    async for line_no, line in iter_lines(stream):
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield line_no, None, f"invalid JSON: {e}"
+            continue
+        if isinstance(record, dict):
+            yield line_no, record, None
+        else:
+            yield line_no, None, "expected a JSON object"
+
+
+async def iter_csv(stream):
+    """Yield (line number, record or None, error or None) per CSV row; the first row is the header.
+
+    Quoted fields may span lines, so physical lines are joined until the
+    quotes balance. Empty cells are dropped so model defaults apply.
+    """
+    header = None
+    record_text = ""
+    record_line = 0
+    async for line_no, line in iter_lines(stream):
+        if not record_text:
+            record_line = line_no
+            record_text = line
+        else:
+            record_text += "\n" + line
+        if record_text.count('"') % 2:
+            continue
+        text, record_text = record_text, ""
+        if not text.strip():
+            continue
+        row = next(csv.reader([text]))
+        if header is None:
+            header = row
+            continue
+        if len(row) != len(header):
+            yield record_line, None, f"expected {len(header)} columns, got {len(row)}"
+            continue
+        yield record_line, {k: v for k, v in zip(header, row) if v != ""}, None
+    if record_text:
+        yield record_line, None, "unterminated quoted field"
+
+
+class BulkImporter:
+    """Validates streamed records with `model` and writes them in insert_many batches.
+
+    Bad rows, whether they fail parsing, validation or the insert itself
+    (e.g. a duplicate id), are collected with their line number and never
+    abort the rest of the import. `prepare` may reject a row by raising
+    ValueError. `on_inserted` is called with the documents of each batch that
+    were actually written, and not at all when none were.
+    """
+
+    def __init__(self, collection, model, batch_size=1000, prepare=None, on_inserted=None):
+        self.collection = collection
+        self.model = model
+        self.batch_size = batch_size
+        self.prepare = prepare
+        self.on_inserted = on_inserted
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def _error(self, line_no, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+    async def run(self, records):
+        batch, lines = [], []
+        async for line_no, record, error in records:
+            if error is not None:
+                self._error(line_no, error)
+                continue
+            try:
+                doc = self.model.model_validate(record).model_dump()
+            except ValidationError as e:
+                self._error(line_no, "; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            if self.prepare is not None:
+                try:
+                    self.prepare(doc)
+                except ValueError as e:
+                    self._error(line_no, str(e))
+                    continue
+            batch.append(doc)
+            lines.append(line_no)
+            if len(batch) >= self.batch_size:
+                await self._flush(batch, lines)
+                batch, lines = [], []
+        if batch:
+            await self._flush(batch, lines)
+        return self.report()
+
+    async def _flush(self, batch, lines):
+        failed = set()
+        try:
+            result = await self.collection.insert_many(batch, ordered=False)
+            self.inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            self.inserted += e.details.get("nInserted", 0)
+            for write_error in e.details.get("writeErrors", []):
+                failed.add(write_error["index"])
+                self._error(lines[write_error["index"]], write_error.get("errmsg", "write failed"))
+        inserted = [doc for i, doc in enumerate(batch) if i not in failed]
+        if inserted and self.on_inserted is not None:
+            self.on_inserted(inserted)
+
+    def report(self):
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errorsTruncated": self.failed > len(self.errors),
+        }
@@ -0,0 +1,144 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def accepted_encodings(header: str) -> set:
+    """Codings from an Accept-Encoding header that are not refused with q=0."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """Negotiated brotli/gzip compression for responses of at least `minimum_size` bytes.
+
+    Streaming responses are compressed chunk by chunk, flushing after each so
+    the client receives every chunk as it is produced. Responses that already
+    carry a Content-Encoding, use an excluded media type (server-sent events)
+    or have no body are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4,
+                 excluded_types=("text/event-stream",)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_types = tuple(excluded_types)
+
+    def _encoder(self, scope):
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accepted = accepted_encodings(value.decode("latin-1"))
+                if brotli is not None and "br" in accepted:
+                    return lambda: _BrotliEncoder(self.brotli_quality)
+                if "gzip" in accepted:
+                    return lambda: _GzipEncoder(self.gzip_level)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        make_encoder = self._encoder(scope) if scope["type"] == "http" else None
+        if make_encoder is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if (b"content-encoding" in headers or message["status"] in (204, 304)
+                        or content_type.startswith(self.excluded_types)):
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = make_encoder()
+                vary = b"Accept-Encoding"
+                headers = []
+                for name, value in start.get("headers", []):
+                    if name.lower() == b"vary":
+                        vary = value + b", " + vary
+                    elif name.lower() != b"content-length":
+                        headers.append((name, value))
+                headers.append((b"content-encoding", encoder.name.encode()))
+                headers.append((b"vary", vary))
+                if not more_body:
+                    body = encoder.compress(body) + encoder.finish()
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**start, "headers": headers})
+
+            chunk = encoder.compress(body)
+            chunk += encoder.flush() if more_body else encoder.finish()
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+# Environment variable -> (MongoClient keyword, parser); unset variables keep driver defaults
+CLIENT_OPTIONS = {
+    'MONGO_MAX_POOL_SIZE': ('maxPoolSize', int),
+    'MONGO_MIN_POOL_SIZE': ('minPoolSize', int),
+    'MONGO_MAX_IDLE_TIME_MS': ('maxIdleTimeMS', int),
+    'MONGO_MAX_CONNECTING': ('maxConnecting', int),
+    'MONGO_WAIT_QUEUE_TIMEOUT_MS': ('waitQueueTimeoutMS', int),
+    'MONGO_SERVER_SELECTION_TIMEOUT_MS': ('serverSelectionTimeoutMS', int),
+    'MONGO_CONNECT_TIMEOUT_MS': ('connectTimeoutMS', int),
+    'MONGO_SOCKET_TIMEOUT_MS': ('socketTimeoutMS', int),
+    'MONGO_COMPRESSORS': ('compressors', str),
+}
+
+
+def client_options_from_env(environ=os.environ) -> dict:
+    options = {}
+    for variable, (option, parse) in CLIENT_OPTIONS.items():
+        value = environ.get(variable)
+        if value:
+            options[option] = parse(value)
+    return options
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters fed by pymongo's CMAP events."""
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.created = 0
+        self.closed = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "open": self.open,
+            "checkedOut": self.checked_out,
+            "idle": self.open - self.checked_out,
+            "created": self.created,
+            "closed": self.closed,
+            "checkoutFailures": self.checkout_failures,
+            "poolClears": self.pool_clears,
+        }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.created += 1
+        self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.closed += 1
+        self.open -= 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+
+def create_client(mongo_url: str, listeners=()) -> AsyncIOMotorClient:
+    options = client_options_from_env()
+    return AsyncIOMotorClient(mongo_url, event_listeners=list(listeners), **options)
+
+
+class LazyCollection:
+    """Collection handle taken from a `LazyDatabase` before it was connected."""
+
+    __slots__ = ("_database", "_name", "_resolved_for", "_collection")
+
+    def __init__(self, database, name: str):
+        self._database = database
+        self._name = name
+        self._resolved_for = None
+        self._collection = None
+
+    def __getattr__(self, attr):
+        database = self._database.resolve()
+        if self._resolved_for is not database:
+            self._collection = database[self._name]
+            self._resolved_for = database
+        return getattr(self._collection, attr)
+
+
+class LazyDatabase:
+    """Stand-in for a Motor database that creates the client on first use.
+
+    `connect()` runs when a database method or item is first needed, not at
+    import, so importing the app never starts monitor threads or resolves a
+    mongodb+srv URL. Collections looked up by attribute before that return
+    a `LazyCollection`, which lets module-level objects hold them. `use()`
+    swaps in an existing database, e.g. a mongomock one for benchmarks.
+    """
+
+    def __init__(self, connect):
+        self._connect = connect
+        self._db = None
+
+    @property
+    def connected(self) -> bool:
+        return self._db is not None
+
+    def resolve(self):
+        if self._db is None:
+            self._db = self._connect()
+        return self._db
+
+    def use(self, database):
+        self._db = database
+
+    def close(self):
+        if self._db is not None:
+            self._db.client.close()
+            self._db = None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._db is None and not hasattr(AsyncIOMotorDatabase, name):
+            return LazyCollection(self, name)
+        return getattr(self.resolve(), name)
+
+    def __getitem__(self, name):
+        return self.resolve()[name]
+
+
+async def ping(client) -> float:
+    """Round-trip a ping command and return its latency in milliseconds."""
+    started = time.perf_counter()
+    await client.admin.command("ping")
+    return (time.perf_counter() - started) * 1000
+
+
+async def warm_up(client, connections: int = 1) -> bool:
+    """Select a server and open `connections` sockets before traffic arrives.
+
+    Returns False when MongoDB could not be reached.
+    """
+    started = time.perf_counter()
+    try:
+        await ping(client)
+        if connections > 1:
+            await asyncio.gather(*(ping(client) for _ in range(connections)))
+    except PyMongoError as e:
+        logger.warning("MongoDB warm-up failed: %s", e)
+        return False
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info("MongoDB warm-up opened %s connection(s) in %.1fms", connections, elapsed_ms)
+    return True
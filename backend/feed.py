@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+INSERTS_ONLY = [{"$match": {"operationType": "insert"}}]
+
+
+class ChangeFeed:
+    """One watcher per process that fans new documents out to subscriber queues.
+
+    `run` tails a change stream of inserts, resuming from the last token after
+    a transient error. Deployments without change streams (standalone mongod)
+    fall back to polling `time_field` while anyone is subscribed; the poll
+    looks back `lookback` seconds to catch late-flushed writes and skips ids
+    it has already published. A subscriber whose queue fills up is dropped
+    (it receives `None`) and is expected to reconnect and backfill.
+    """
+
+    def __init__(self, collection, fields, time_field, poll_interval=1.0, lookback=10.0,
+                 queue_size=256, retry_delay=5.0):
+        self.collection = collection
+        self.projection = {"_id": 0, **{field: 1 for field in fields}}
+        self.fields = tuple(fields)
+        self.time_field = time_field
+        self.poll_interval = poll_interval
+        self.lookback = timedelta(seconds=lookback)
+        self.queue_size = queue_size
+        self.retry_delay = retry_delay
+        self._subscribers = set()
+        self._seen = OrderedDict()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, doc: dict):
+        if doc["id"] in self._seen:
+            return
+        self._seen[doc["id"]] = None
+        if len(self._seen) > 10 * self.queue_size:
+            self._seen.popitem(last=False)
+        doc = {field: doc.get(field) for field in self.fields}
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(doc)
+            except asyncio.QueueFull:
+                self._drop(queue)
+
+    def _drop(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def close(self):
+        for queue in list(self._subscribers):
+            self._drop(queue)
+
+    async def run(self):
+        try:
+            if not await self._watch():
+                await self._poll()
+        finally:
+            self.close()
+
+    async def _watch(self) -> bool:
+        """Publish inserts from a change stream; returns False if streams are unsupported."""
+        resume_token = None
+        while True:
+            try:
+                async with self.collection.watch(INSERTS_ONLY, resume_after=resume_token) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self.publish(change["fullDocument"])
+            except OperationFailure as e:
+                if resume_token is None:
+                    logger.info("Change stream on %s unavailable, polling %s instead: %s",
+                                self.collection.name, self.time_field, e)
+                    return False
+                logger.warning("Change stream on %s lost its resume point: %s",
+                               self.collection.name, e)
+                resume_token = None
+            except PyMongoError as e:
+                logger.warning("Change stream on %s interrupted: %s", self.collection.name, e)
+            await asyncio.sleep(self.retry_delay)
+
+    async def _poll(self):
+        watermark = datetime.utcnow()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not self._subscribers:
+                watermark = datetime.utcnow()
+                continue
+            try:
+                cursor = self.collection.find(
+                    {self.time_field: {"$gte": watermark - self.lookback}}, self.projection
+                ).sort([(self.time_field, ASCENDING), ("id", ASCENDING)])
+                async for doc in cursor:
+                    self.publish(doc)
+                    watermark = max(watermark, doc[self.time_field])
+            except PyMongoError as e:
+                logger.warning("Polling %s for new documents failed: %s", self.collection.name, e)
@@ -0,0 +1,85 @@
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+
+class TTLCache:
+    """LRU mapping whose entries also expire `ttl` seconds after being set."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def discard(self, key):
+        self._entries.pop(key, None)
+
+    def set(self, key, value):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+def content_hash(email: str, message: str) -> str:
+    """Fingerprint of a submission's sender and text, insensitive to case/whitespace padding."""
+    return hashlib.sha256(f"{email.strip().lower()}\0{message.strip()}".encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Remembers which contact submission each Idempotency-Key produced.
+
+    Keys live in a TTL-indexed collection so every worker sees them, fronted
+    by an in-process LRU so a retried key is usually answered without a
+    database round trip.
+    """
+
+    def __init__(self, collection, ttl: float, cache_size: int = 10000):
+        self.collection = collection
+        self.ttl = ttl
+        self._cache = TTLCache(cache_size, ttl)
+
+    def cached(self, key: str):
+        return self._cache.get(key)
+
+    async def lookup(self, key: str):
+        contact_id = self._cache.get(key)
+        if contact_id is None:
+            doc = await self.collection.find_one(
+                {"_id": key, "createdAt": {"$gte": datetime.utcnow() - timedelta(seconds=self.ttl)}},
+                {"contactId": 1},
+            )
+            if doc is not None:
+                contact_id = doc["contactId"]
+                self._cache.set(key, contact_id)
+        return contact_id
+
+    async def claim(self, key: str, contact_id: str):
+        """Bind `key` to `contact_id`; returns the id it is already bound to, if any."""
+        try:
+            await self.collection.insert_one(
+                {"_id": key, "contactId": contact_id, "createdAt": datetime.utcnow()}
+            )
+        except DuplicateKeyError:
+            return await self.lookup(key)
+        self._cache.set(key, contact_id)
+        return None
+
+    async def release(self, key: str, contact_id: str):
+        """Undo a claim whose submission could not be stored."""
+        self._cache.discard(key)
+        await self.collection.delete_one({"_id": key, "contactId": contact_id})
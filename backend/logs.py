@@ -0,0 +1,177 @@
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+
+import orjson
+
+from metrics import Counter
+
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+REQUEST_ID_RE = re.compile(r"^[\w.:-]{1,128}$")
+
+request_id = contextvars.ContextVar("request_id", default=None)
+access_logger = logging.getLogger("access")
+log_records_dropped = Counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full.")
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener = None
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, requestId and `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["requestId"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of INFO-and-below records per logger; warnings and errors always pass.
+
+    `rates` maps logger names to the fraction kept; a logger without an
+    entry inherits its nearest dotted parent's rate, otherwise keeps all.
+    """
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        name = record.name
+        while name:
+            rate = self.rates.get(name)
+            if rate is not None:
+                return random.random() < rate
+            name = name.rpartition(".")[0]
+        return True
+
+
+def parse_sample_rates(spec: str) -> dict:
+    """Parse "access=0.1,server=0.5" into {"access": 0.1, "server": 0.5}."""
+    rates = {}
+    for part in spec.split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread without formatting or blocking the caller.
+
+    The stock QueueHandler merges `msg % args` on the calling thread; here
+    that happens on the listener thread, so arguments must not be mutated
+    after logging. When the queue is full the record is dropped and counted
+    in `log_records_dropped_total` rather than waiting for the writer.
+    """
+
+    def prepare(self, record):
+        record.request_id = request_id.get()
+        if record.exc_info:
+            # Render tracebacks now rather than keep their frames alive in the queue
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped.inc()
+
+
+def configure_logging(level="INFO", fmt="json", sample_rates=None, queue_size=10000):
+    """Route the root logger through a bounded queue to a stderr writer thread."""
+    global _listener
+    if _listener is not None:
+        return
+    output = logging.StreamHandler()
+    output.setFormatter(JSONFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    log_queue = queue.Queue(queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rates or {}))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """Tags each HTTP request with an id and writes one access log record for it.
+
+    The id comes from a well-formed incoming X-Request-ID header or is
+    generated, is echoed back in the response and is attached to every log
+    record emitted while the request is handled. Access records carry
+    method, path, status and latencyMs; 5xx responses log at WARNING so
+    sampling never hides them.
+    """
+
+    def __init__(self, app, header="x-request-id"):
+        self.app = app
+        self.header = header.encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers", [])).get(self.header, b"").decode("latin-1")
+        rid = incoming if REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(rid)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (self.header, rid.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency_ms = round((time.perf_counter() - started) * 1000, 2)
+            level = logging.WARNING if status >= 500 else logging.INFO
+            if access_logger.isEnabledFor(level):
+                access_logger.log(level, "%s %s %s %.1fms", scope["method"], scope["path"], status,
+                                  latency_ms, extra={"method": scope["method"], "path": scope["path"],
+                                                     "status": status, "latencyMs": latency_ms})
+            request_id.reset(token)
@@ -0,0 +1,279 @@
+import bisect
+import contextvars
+import functools
+import logging
+import os
+import random
+import threading
+import time
+
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            yield from self._samples(labelvalues, value)
+
+    def _samples(self, labelvalues, value):
+        yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are read from `callback()` -> {labelvalues: value} at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames, callback):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labelvalues, value in self.callback().items():
+            yield from self._samples(labelvalues, value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self, labelvalues, state):
+        counts, total, count = state
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+            cumulative += bucket_count
+            le = bound if bound == "+Inf" else _number(bound)
+            yield f"{self.name}_bucket{_labels(self.labelnames, labelvalues, [('le', le)])} {cumulative}"
+        yield f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}"
+        yield f"{self.name}_count{_labels(self.labelnames, labelvalues)} {count}"
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+http_latency = Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+http_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.")
+process_startup = Gauge(
+    "process_startup_seconds", "Time this worker spent in each startup phase.", ("phase",))
+mongo_commands = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round-trip time.",
+    ("command", "outcome"), buckets=MONGO_BUCKETS)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Feeds driver-reported command durations into `mongo_commands`."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_commands.observe(event.duration_micros / 1e6, event.command_name, "success")
+
+    def failed(self, event):
+        mongo_commands.observe(event.duration_micros / 1e6, event.command_name, "failure")
+
+
+class StartupReport:
+    """Times one worker's module import, lifespan startup and first request.
+
+    Each phase is logged once with the worker pid and exported through
+    `process_startup_seconds`, so cold-start cost is visible per process.
+    """
+
+    def __init__(self, import_started: float):
+        self.import_started = import_started
+        self.first_request_pending = True
+
+    def record(self, phase: str, seconds: float, detail: str = ""):
+        process_startup.set(seconds, phase)
+        logger.info("Worker %s %s took %.1fms%s", os.getpid(), phase, seconds * 1000, detail)
+
+    def imported(self):
+        self.record("import", time.perf_counter() - self.import_started)
+
+    def first_request(self, seconds: float, method: str, route: str):
+        self.first_request_pending = False
+        self.record("first_request", seconds, f" ({method} {route})")
+
+
+class RequestTimings:
+    __slots__ = ("started", "route", "handler_started", "handler_finished")
+
+    def __init__(self, started):
+        self.started = started
+        self.route = None
+        self.handler_started = None
+        self.handler_finished = None
+
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that stamps the route template and endpoint start/end on the request.
+
+    Everything before the endpoint runs (body parsing, pydantic validation,
+    dependencies) counts as "validate", the endpoint body as "db", and response
+    model validation, encoding and sending as "serialize".
+    """
+
+    def __init__(self, path, endpoint, **kwargs):
+        endpoint = getattr(endpoint, "__timed_endpoint__", endpoint)
+
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kw):
+            timings = _current.get()
+            if timings is None:
+                return await endpoint(*args, **kw)
+            timings.route = path
+            timings.handler_started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kw)
+            finally:
+                timings.handler_finished = time.perf_counter()
+
+        timed_endpoint.__timed_endpoint__ = endpoint
+        super().__init__(path, timed_endpoint, **kwargs)
+
+
+class MetricsMiddleware:
+    """Records per-route request counts, latency and in-flight requests.
+
+    Requests slower than `slow_ms` are logged with a validate/db/serialize
+    breakdown, sampled at `slow_sample_rate`; `slow_ms=0` disables the log.
+    The first request served is reported to `startup_report`, if given.
+    """
+
+    def __init__(self, app, slow_ms=0.0, slow_sample_rate=1.0, startup_report=None):
+        self.app = app
+        self.slow_ms = slow_ms
+        self.slow_sample_rate = slow_sample_rate
+        self.startup_report = startup_report
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(time.perf_counter())
+        token = _current.set(timings)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finished = time.perf_counter()
+            http_in_flight.dec()
+            _current.reset(token)
+            route = timings.route or ("unmatched" if "endpoint" not in scope else scope["path"])
+            elapsed = finished - timings.started
+            http_requests.inc(scope["method"], route, str(status))
+            http_latency.observe(elapsed, scope["method"], route)
+            if self.startup_report is not None and self.startup_report.first_request_pending:
+                self.startup_report.first_request(elapsed, scope["method"], route)
+            if self.slow_ms and elapsed * 1000 >= self.slow_ms \
+                    and random.random() < self.slow_sample_rate:
+                self._log_slow(scope["method"], route, status, timings, finished)
+
+    @staticmethod
+    def _log_slow(method, route, status, timings, finished):
+        total = (finished - timings.started) * 1000
+        if timings.handler_started is None:
+            logger.warning("Slow request %s %s %s: total=%.1fms", method, route, status, total,
+                           extra={"latencyMs": round(total, 2)})
+            return
+        validate = (timings.handler_started - timings.started) * 1000
+        db_ms = (timings.handler_finished - timings.handler_started) * 1000
+        serialize = (finished - timings.handler_finished) * 1000
+        logger.warning("Slow request %s %s %s: total=%.1fms "
+                       "validate=%.1fms db=%.1fms serialize=%.1fms",
+                       method, route, status, total, validate, db_ms, serialize,
+                       extra={"latencyMs": round(total, 2), "validateMs": round(validate, 2),
+                              "dbMs": round(db_ms, 2), "serializeMs": round(serialize, 2)})
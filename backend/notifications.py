@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import random
+import smtplib
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from pymongo.errors import PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+CLAIM_PROJECTION = {"_id": 0, "id": 1, "name": 1, "email": 1, "message": 1, "submittedAt": 1}
+
+
+class MailTransport:
+    """Delivers a batch of messages; raise to signal the batch should be retried."""
+
+    async def send(self, messages):
+        raise NotImplementedError
+
+
+class SMTPTransport(MailTransport):
+    """Sends each batch over a single SMTP connection in a worker thread."""
+
+    def __init__(self, host, port=587, username=None, password=None, starttls=True, timeout=10):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    async def send(self, messages):
+        await asyncio.to_thread(self._send_sync, messages)
+
+    def _send_sync(self, messages):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                smtp.send_message(message)
+
+
+class FakeSMTPTransport(MailTransport):
+    """In-memory transport for local runs and tests; `fail_next` simulates outages."""
+
+    def __init__(self, fail_next=0):
+        self.outbox = []
+        self.fail_next = fail_next
+
+    async def send(self, messages):
+        if self.fail_next:
+            self.fail_next -= 1
+            raise ConnectionError("simulated SMTP failure")
+        self.outbox.extend(messages)
+
+
+class NotificationDispatcher:
+    """Background delivery of contact-submission notifications.
+
+    Submissions are stored with `notification.state = "pending"` and handed
+    to `enqueue`; the HTTP path never talks to SMTP. Workers claim queued
+    submissions atomically in Mongo (so several processes can share the
+    collection), send them through the transport in batches and record the
+    outcome on each document, retrying failed batches with exponential
+    backoff. In digest mode (`digest_size` > 1 or `digest_interval` > 0) one
+    summary email is sent per `digest_size` submissions or per interval,
+    whichever comes first; with only a size set, a partial digest still goes
+    out after `digest_max_wait` seconds.
+    A periodic sweep re-queues pending documents this process never saw, e.g.
+    after a restart or a full queue.
+    """
+
+    def __init__(self, collection, transport, sender, recipient, workers=2,
+                 batch_size=10, max_retries=5, retry_base_delay=2.0,
+                 digest_size=0, digest_interval=0.0, digest_max_wait=3600.0, max_queue=1000,
+                 sweep_interval=60.0, stale_after=600.0):
+        self.collection = collection
+        self.transport = transport
+        self.sender = sender
+        self.recipient = recipient
+        self.digest = digest_size > 1 or digest_interval > 0
+        self.workers = 1 if self.digest else workers
+        if not self.digest:
+            self.batch_size, self.batch_wait = batch_size, 0.0
+        else:
+            # Interval-only digests take everything queued; size-only ones wait for N
+            self.batch_size = digest_size if digest_size > 1 else max_queue
+            self.batch_wait = digest_interval if digest_interval > 0 else digest_max_wait
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.sweep_interval = sweep_interval
+        self.stale_after = stale_after
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, contact_doc: dict):
+        try:
+            self._queue.put_nowait(contact_doc["id"])
+        except asyncio.QueueFull:
+            logger.warning("Notification queue full, %s left for the sweep", contact_doc['id'])
+
+    def _claimable(self, now):
+        return {"$or": [
+            {"notification.state": PENDING},
+            {"notification.state": SENDING,
+             "notification.claimedAt": {"$lt": now - timedelta(seconds=self.stale_after)}},
+        ]}
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                cursor = self.collection.find(
+                    self._claimable(datetime.utcnow()), {"_id": 0, "id": 1}
+                ).limit(self._queue.maxsize)
+                async for doc in cursor:
+                    self.enqueue(doc)
+            except PyMongoError as e:
+                logger.warning("Notification sweep failed: %s", e)
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        ids = [await self._queue.get()]
+        deadline = loop.time() + self.batch_wait
+        while len(ids) < self.batch_size:
+            if not self._queue.empty():
+                ids.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                ids.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return list(dict.fromkeys(ids))
+
+    async def _worker(self):
+        while True:
+            ids = await self._next_batch()
+            try:
+                contacts = await self._claim(ids)
+                if contacts:
+                    await self._deliver(contacts)
+            except PyMongoError as e:
+                logger.error("Notification batch of %s failed: %s", len(ids), e)
+
+    async def _claim(self, ids):
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        await self.collection.update_many(
+            {"id": {"$in": ids}, **self._claimable(now)},
+            {"$set": {"notification.state": SENDING, "notification.claim": token,
+                      "notification.claimedAt": now}},
+        )
+        return await self.collection.find(
+            {"notification.claim": token}, CLAIM_PROJECTION
+        ).to_list(len(ids))
+
+    async def _deliver(self, contacts):
+        ids = [contact["id"] for contact in contacts]
+        messages = [self._digest(contacts)] if self.digest else [self._message(c) for c in contacts]
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self.transport.send(messages)
+            except Exception as e:
+                await self._record(ids, {"notification.lastError": str(e)}, attempts=1)
+                if attempt == self.max_retries:
+                    await self._record(ids, {"notification.state": FAILED})
+                    logger.error("Giving up on notifications for %s submissions: %s", len(ids), e)
+                    return
+                delay = self.retry_base_delay * 2 ** (attempt - 1)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            else:
+                await self._record(ids, {"notification.state": SENT,
+                                         "notification.sentAt": datetime.utcnow()}, attempts=1)
+                return
+
+    async def _record(self, ids, fields, attempts=0):
+        update = {"$set": fields}
+        if attempts:
+            update["$inc"] = {"notification.attempts": attempts}
+        await self.collection.update_many({"id": {"$in": ids}}, update)
+
+    def _message(self, contact):
+        message = EmailMessage()
+        message["Subject"] = f"New contact submission from {contact['name']}"
+        message["From"] = self.sender
+        message["To"] = self.recipient
+        message["Reply-To"] = contact["email"]
+        message.set_content(
+            f"{contact['name']} <{contact['email']}> wrote at "
+            f"{contact['submittedAt'].isoformat()}:\n\n{contact['message']}\n"
+        )
+        return message
+
+    def _digest(self, contacts):
+        message = EmailMessage()
+        message["Subject"] = f"{len(contacts)} new contact submissions"
+        message["From"] = self.sender
+        message["To"] = self.recipient
+        message.set_content("\n\n".join(
+            f"{c['name']} <{c['email']}> at {c['submittedAt'].isoformat()}:\n{c['message']}"
+            for c in contacts
+        ) + "\n")
+        return message
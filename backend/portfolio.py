@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_FIELDS = ("personalInfo", "about", "skills", "experience", "projects")
+PORTFOLIO_PROJECTION = {"_id": 0, **{field: 1 for field in PORTFOLIO_FIELDS},
+                        "version": 1, "updatedAt": 1}
+VERSION_PROJECTION = {"_id": 0, "version": 1, "updatedAt": 1}
+ACTIVE = {"isActive": True}
+
+
+def _version_of(doc: dict):
+    return doc.get("version"), doc.get("updatedAt")
+
+
+class PortfolioCache:
+    """Process-local cache of the active portfolio document as JSON bytes.
+
+    The payload is serialized once per version together with a strong ETag.
+    Staleness is bounded by `refresh_interval`: after that a projection-only
+    probe compares `version`/`updatedAt` and reloads only if either changed.
+    When the deployment supports change streams, `watch` invalidates the cache
+    as soon as the collection is written.
+    """
+
+    def __init__(self, collection, refresh_interval=5.0):
+        self.collection = collection
+        self.refresh_interval = refresh_interval
+        self._body = None
+        self._etag = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._checked_at = 0.0
+
+    async def get(self):
+        """Return (body, etag), or (None, None) if no active portfolio exists."""
+        if time.monotonic() - self._checked_at < self.refresh_interval:
+            return self._body, self._etag
+        async with self._lock:
+            if time.monotonic() - self._checked_at >= self.refresh_interval:
+                await self._refresh()
+        return self._body, self._etag
+
+    async def _refresh(self):
+        probe = await self.collection.find_one(ACTIVE, VERSION_PROJECTION)
+        if probe is None:
+            self._body = self._etag = self._version = None
+        elif self._body is None or _version_of(probe) != self._version:
+            doc = await self.collection.find_one(ACTIVE, PORTFOLIO_PROJECTION)
+            if doc is not None:
+                self._load(doc)
+        self._checked_at = time.monotonic()
+
+    def _load(self, doc: dict):
+        payload = {field: doc.get(field) for field in PORTFOLIO_FIELDS}
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+        self._body = body
+        self._etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self._version = _version_of(doc)
+
+    async def seed(self, path):
+        """Insert the bundled portfolio content when no active document exists."""
+        with open(path, encoding="utf-8") as f:
+            content = json.load(f)
+        result = await self.collection.update_one(
+            ACTIVE,
+            {"$setOnInsert": {**content, "version": "1", "updatedAt": datetime.utcnow()}},
+            upsert=True,
+        )
+        if result.upserted_id is not None:
+            self.invalidate()
+            logger.info("Seeded portfolio data from %s", path)
+
+    async def watch(self, retry_delay=5.0):
+        """Invalidate on every change stream event; returns if streams are unsupported."""
+        while True:
+            try:
+                async with self.collection.watch() as stream:
+                    async for _ in stream:
+                        self.invalidate()
+            except OperationFailure as e:
+                logger.info("Portfolio change stream unavailable, using version polling: %s", e)
+                return
+            except PyMongoError as e:
+                logger.warning("Portfolio change stream interrupted: %s", e)
+            await asyncio.sleep(retry_delay)
@@ -0,0 +1,196 @@
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from starlette.responses import JSONResponse
+
+
+logger = logging.getLogger(__name__)
+
+MAX_INSPECTED_BODY = 64 * 1024
+
+
+def client_ip(scope, trusted_hops: int = 0) -> str:
+    """Best-effort client address behind `trusted_hops` reverse proxies.
+
+    Each proxy appends the address it received the request from to
+    X-Forwarded-For, so only the rightmost `trusted_hops` entries are
+    trustworthy; anything further left is whatever the client sent. With no
+    trusted hops, or fewer entries than hops, the peer address is used.
+    """
+    if trusted_hops > 0:
+        forwarded = []
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                forwarded.extend(part.strip() for part in value.decode("latin-1").split(","))
+        if len(forwarded) >= trusted_hops and forwarded[-trusted_hops]:
+            return forwarded[-trusted_hops]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class MemoryTokenBucket:
+    """Per-key token buckets held in an LRU-bounded dict.
+
+    Suitable for a single worker: every operation is O(1) and the least
+    recently seen key is evicted once `max_keys` buckets exist.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, max_keys: int = 10000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def acquire(self, key: str) -> float:
+        """Take one token for `key`; returns 0 if allowed, else seconds to wait."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / self.refill_per_second
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class MongoTokenBucket:
+    """Token buckets shared by all workers through a TTL-expired collection.
+
+    Each acquire is a single atomic pipeline update on the bucket document;
+    idle buckets are dropped by the TTL index on `expiresAt` once they would
+    have refilled completely.
+    """
+
+    def __init__(self, collection, capacity: float, refill_per_second: float):
+        self.collection = collection
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+
+    async def acquire(self, key: str) -> float:
+        now = datetime.utcnow()
+        refilled = {"$min": [
+            self.capacity,
+            {"$add": [
+                {"$ifNull": ["$tokens", self.capacity]},
+                {"$multiply": [
+                    {"$subtract": [now, {"$ifNull": ["$updatedAt", now]}]},
+                    self.refill_per_second / 1000,
+                ]},
+            ]},
+        ]}
+        full_after = timedelta(seconds=self.capacity / self.refill_per_second)
+        bucket = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updatedAt": now}},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expiresAt": now + full_after,
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if bucket["allowed"]:
+            return 0.0
+        return (1 - bucket["tokens"]) / self.refill_per_second
+
+
+class RateLimitMiddleware:
+    """Throttles selected routes per client IP and per submitted email.
+
+    Runs before routing, so rejected requests never reach pydantic validation
+    or the database. The email is read from the raw JSON body, which is then
+    replayed unchanged to the application.
+    """
+
+    def __init__(self, app, ip_limiter, email_limiter=None, routes=(),
+                 trusted_hops: int = 0):
+        self.app = app
+        self.ip_limiter = ip_limiter
+        self.email_limiter = email_limiter
+        self.routes = set(routes)
+        self.trusted_hops = trusted_hops
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in self.routes:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"ip:{client_ip(scope, self.trusted_hops)}"
+        retry_after = await self._acquire(self.ip_limiter, key)
+        if not retry_after and self.email_limiter is not None:
+            body, receive = await self._buffer_body(receive)
+            email = self._email_from(body)
+            if email:
+                retry_after = await self._acquire(self.email_limiter, f"email:{email}")
+
+        if retry_after:
+            response = JSONResponse(
+                {"detail": "Too many requests, please try again later"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _acquire(limiter, key: str) -> float:
+        try:
+            return await limiter.acquire(key)
+        except PyMongoError as e:
+            # Fail open: an unavailable limiter store must not take the form down
+            logger.warning("Rate limiter unavailable, allowing request: %s", e)
+            return 0.0
+
+    @staticmethod
+    async def _buffer_body(receive):
+        """Read the body unless it exceeds MAX_INSPECTED_BODY; returns (body or None, receive).
+
+        Reading stops as soon as the limit is passed, so an oversized upload
+        is never held in memory here. The returned receive replays the
+        buffered messages as they arrived, then continues with the live ones.
+        """
+        messages = []
+        size = 0
+        while size <= MAX_INSPECTED_BODY:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        last = messages[-1]
+        complete = last["type"] == "http.request" and not last.get("more_body", False)
+        body = b"".join(message.get("body", b"") for message in messages) if complete else None
+        buffered = iter(messages)
+
+        async def replay():
+            message = next(buffered, None)
+            return message if message is not None else await receive()
+
+        return body, replay
+
+    @staticmethod
+    def _email_from(body):
+        if body is None or len(body) > MAX_INSPECTED_BODY:
+            return None
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return None
+        email = payload.get("email") if isinstance(payload, dict) else None
+        return email.strip().lower() if isinstance(email, str) else None
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+
+def floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _date_parts(field: str, *parts: str) -> dict:
+    operators = {"year": "$year", "month": "$month", "day": "$dayOfMonth", "hour": "$hour"}
+    return {"$dateFromParts": {part: {operators[part]: field} for part in parts}}
+
+
+class Rollup:
+    """Watermark bookkeeping shared by the incremental `$merge` rollups.
+
+    Each rollup keeps its watermark in `rollup_state` under `STATE_ID`;
+    subclasses implement `run_once`, which advances it.
+    """
+
+    STATE_ID = None
+    description = "periods"
+
+    def __init__(self, db, interval=300.0, grace=60.0):
+        self.db = db
+        self.interval = interval
+        self.grace = timedelta(seconds=grace)
+
+    async def watermark(self):
+        state = await self.db.rollup_state.find_one({"_id": self.STATE_ID})
+        return state["watermark"] if state else None
+
+    async def _save_watermark(self, value: datetime):
+        await self.db.rollup_state.update_one(
+            {"_id": self.STATE_ID},
+            {"$set": {"watermark": value, "updatedAt": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    async def rewind(self, value: datetime):
+        """Move the watermark back to `value` so older data is rolled up again."""
+        await self.db.rollup_state.update_one({"_id": self.STATE_ID}, {"$min": {"watermark": value}})
+
+    async def run_once(self, now=None) -> int:
+        raise NotImplementedError
+
+    async def run_forever(self):
+        while True:
+            try:
+                periods = await self.run_once()
+                if periods:
+                    logger.info("Rolled up %s %s", periods, self.description)
+            except PyMongoError as e:
+                logger.error("Rollup of %s failed: %s", self.description, e)
+            await asyncio.sleep(self.interval)
+
+
+class StatusRollup(Rollup):
+    """Compacts raw status checks into per-client, per-hour bucket documents.
+
+    Each run aggregates the closed hours between the stored watermark and
+    `now - grace` and `$merge`s them into `status_check_buckets`, replacing
+    any bucket it recomputes, so re-running a range is harmless. Runs are
+    chunked to `max_hours` so a large backlog is worked through
+    incrementally. The raw collection's TTL must comfortably exceed
+    `interval + grace`, otherwise checks can expire before they are rolled up.
+    """
+
+    STATE_ID = "status_checks_hourly"
+    description = "hour(s) of status checks"
+
+    def __init__(self, db, interval=300.0, grace=60.0, max_hours=24 * 7):
+        super().__init__(db, interval, grace)
+        self.max_hours = max_hours
+
+    async def run_once(self, now=None) -> int:
+        """Roll up every closed hour not yet processed; returns the hours covered."""
+        upper = floor_hour((now or datetime.utcnow()) - self.grace)
+        lower = await self.watermark()
+        if lower is None:
+            oldest = await self.db.status_checks.find_one(
+                {}, {"_id": 0, "timestamp": 1}, sort=[("timestamp", 1)]
+            )
+            if oldest is None:
+                return 0
+            lower = floor_hour(oldest["timestamp"])
+
+        hours = 0
+        while lower < upper:
+            chunk_end = min(upper, lower + timedelta(hours=self.max_hours))
+            await self._aggregate(lower, chunk_end)
+            await self._save_watermark(chunk_end)
+            hours += int((chunk_end - lower).total_seconds() // 3600)
+            lower = chunk_end
+        return hours
+
+    async def add_late(self, tally: "LateBuckets"):
+        """Add checks written behind the watermark to their buckets.
+
+        The rollup never revisits those hours, and recomputing them with
+        `replace` would drop checks that have since expired, so counts are
+        incremented instead.
+        """
+        if not tally.buckets:
+            return
+        await self.db.status_check_buckets.bulk_write([
+            UpdateOne(
+                {"_id": {"client_name": client_name, "hour": hour}},
+                {"$inc": {"count": count}, "$min": {"firstSeen": first},
+                 "$max": {"lastSeen": last},
+                 "$setOnInsert": {"client_name": client_name, "hour": hour}},
+                upsert=True,
+            )
+            for (client_name, hour), (count, first, last) in tally.buckets.items()
+        ], ordered=False)
+
+    async def refresh(self, start: datetime):
+        """Recompute the hours from `start` up to the watermark, e.g. after writes raced a run."""
+        end = await self.watermark()
+        while end is not None and start < end:
+            chunk_end = min(end, start + timedelta(hours=self.max_hours))
+            await self._aggregate(start, chunk_end)
+            start = chunk_end
+
+    async def _aggregate(self, start, end):
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": start, "$lt": end}}},
+            {"$group": {
+                "_id": {
+                    "client_name": "$client_name",
+                    "hour": _date_parts("$timestamp", "year", "month", "day", "hour"),
+                },
+                "count": {"$sum": 1},
+                "firstSeen": {"$min": "$timestamp"},
+                "lastSeen": {"$max": "$timestamp"},
+            }},
+            {"$set": {"client_name": "$_id.client_name", "hour": "$_id.hour"}},
+            {"$merge": {"into": "status_check_buckets", "on": "_id",
+                        "whenMatched": "replace", "whenNotMatched": "insert"}},
+        ]
+        async for _ in self.db.status_checks.aggregate(pipeline):
+            pass
+
+
+class LateBuckets:
+    """Per-(client, hour) tallies of status checks in hours before `watermark`."""
+
+    def __init__(self, watermark):
+        self.watermark = watermark
+        self.buckets = {}
+
+    def add(self, docs):
+        if self.watermark is None:
+            return
+        for doc in docs:
+            timestamp = doc["timestamp"]
+            hour = floor_hour(timestamp)
+            if hour >= self.watermark:
+                continue
+            key = (doc["client_name"], hour)
+            count, first, last = self.buckets.get(key, (0, timestamp, timestamp))
+            self.buckets[key] = (count + 1, min(first, timestamp), max(last, timestamp))
+
+
+class ContactStatsRollup(Rollup):
+    """Daily contact submission counts broken down by status and sender domain.
+
+    One document per day lands in `contact_stats_daily` (`_id` is the day)
+    with a `breakdown` of {status, domain, count} entries. Each run recomputes
+    whole days from the day holding the watermark up to `now - grace` and
+    replaces those day documents, so the open day stays current and late
+    writes within it are picked up. Runs are chunked to `max_days`; bulk
+    imports of older submissions `rewind` the watermark to their oldest day.
+    """
+
+    STATE_ID = "contact_stats_daily"
+    description = "day(s) of contact submissions"
+
+    def __init__(self, db, interval=300.0, grace=60.0, max_days=31):
+        super().__init__(db, interval, grace)
+        self.max_days = max_days
+
+    async def run_once(self, now=None) -> int:
+        """Recompute every day touched since the watermark; returns the days covered."""
+        upper = (now or datetime.utcnow()) - self.grace
+        lower = await self.watermark()
+        if lower is None:
+            oldest = await self.db.contact_submissions.find_one(
+                {}, {"_id": 0, "submittedAt": 1}, sort=[("submittedAt", 1)]
+            )
+            if oldest is None:
+                return 0
+            lower = oldest["submittedAt"]
+
+        day = floor_day(lower)
+        last_day = floor_day(upper)
+        days = 0
+        while day <= last_day:
+            chunk_end = min(day + timedelta(days=self.max_days), last_day + timedelta(days=1))
+            await self._aggregate(day, chunk_end)
+            await self._save_watermark(min(chunk_end, upper))
+            days += (chunk_end - day).days
+            day = chunk_end
+        return days
+
+    async def _aggregate(self, start, end):
+        pipeline = [
+            {"$match": {"submittedAt": {"$gte": start, "$lt": end}}},
+            {"$group": {
+                "_id": {
+                    "day": _date_parts("$submittedAt", "year", "month", "day"),
+                    "status": "$status",
+                    "domain": {"$toLower": {"$arrayElemAt": [{"$split": ["$email", "@"]}, -1]}},
+                },
+                "count": {"$sum": 1},
+            }},
+            {"$group": {
+                "_id": "$_id.day",
+                "total": {"$sum": "$count"},
+                "breakdown": {"$push": {
+                    "status": "$_id.status", "domain": "$_id.domain", "count": "$count",
+                }},
+            }},
+            {"$merge": {"into": "contact_stats_daily", "on": "_id",
+                        "whenMatched": "replace", "whenNotMatched": "insert"}},
+        ]
+        async for _ in self.db.contact_submissions.aggregate(pipeline):
+            pass
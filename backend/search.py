@@ -0,0 +1,100 @@
+import bisect
+import heapq
+import math
+import re
+from collections import Counter
+
+TOKEN_RE = re.compile(r"\w+")
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have i if in is it its me my of on or so "
+    "that the this to was we were will with you your".split()
+)
+SEARCH_FIELDS = ("name", "email", "message")
+
+
+def tokenize(text: str):
+    """Lowercased word tokens minus common stop words; emails split on punctuation."""
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """In-process term -> {contact id: term frequency} index over contact submissions.
+
+    Used when the deployment has no text index support. Ranking is a plain
+    tf-idf sum over the query terms (no stemming), so scores differ from
+    MongoDB's textScore but order results the same way for typical queries.
+    Each term also keeps its ids ordered by (-tf, id), which lets `search`
+    stop reading posting lists once no unseen document can reach the page
+    (Fagin's threshold algorithm) instead of scoring every match.
+    Documents are only ever added; the API has no delete path.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._impacts = {}
+        self._ids = set()
+        self.ready = False
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, doc: dict):
+        doc_id = doc["id"]
+        if doc_id in self._ids:
+            return
+        self._ids.add(doc_id)
+        text = " ".join(doc.get(field) or "" for field in SEARCH_FIELDS)
+        for token, count in Counter(tokenize(text)).items():
+            postings = self._postings.setdefault(token, {})
+            postings[doc_id] = count
+            impacts = self._impacts.setdefault(token, [])
+            if self.ready:
+                bisect.insort(impacts, doc_id, key=lambda d: (-postings[d], d))
+            else:
+                impacts.append(doc_id)
+
+    def finish_build(self):
+        """Order every posting list once after the initial bulk load and start serving."""
+        for token, impacts in self._impacts.items():
+            impacts.sort(key=lambda d, postings=self._postings[token]: (-postings[d], d))
+        self.ready = True
+
+    def search(self, query: str, limit: int, after=None):
+        """Top `limit` (score, id) pairs ordered by score desc, id asc, strictly after `after`."""
+        total = len(self._ids)
+        terms = []
+        for token in sorted(set(tokenize(query))):
+            postings = self._postings.get(token)
+            if postings:
+                terms.append((math.log(1 + total / len(postings)), postings, self._impacts[token]))
+        if not terms:
+            return []
+        weights = [(idf, postings.get) for idf, postings, _ in terms]
+        after_key = None if after is None else (-after[0], after[1])
+
+        seen = set()
+        matches = []
+        depth, step = 0, limit
+        while True:
+            end = depth + step
+            for _, _, impacts in terms:
+                for doc_id in impacts[depth:end]:
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+                    key = (-sum(idf * tf(doc_id, 0) for idf, tf in weights), doc_id)
+                    if after_key is None or key > after_key:
+                        matches.append(key)
+            depth, step = end, step * 2
+
+            # Any unseen document scores at most `threshold`, and on a tie its id is >= `min_id`
+            threshold, min_id, exhausted = 0.0, "", True
+            for idf, postings, impacts in terms:
+                if depth < len(impacts):
+                    next_id = impacts[depth]
+                    threshold += idf * postings[next_id]
+                    min_id = max(min_id, next_id)
+                    exhausted = False
+            top = heapq.nsmallest(limit, matches)
+            if exhausted or (len(top) == limit and top[-1] < (-threshold, min_id)):
+                return [(-neg_score, doc_id) for neg_score, doc_id in top]
@@ -1,29 +1,79 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from dotenv import load_dotenv
+import time
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
 import logging
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from bulk import BulkImporter, export_csv, export_ndjson, iter_csv, iter_ndjson
+from compression import CompressionMiddleware
+from database import LazyDatabase, PoolStats, create_client, ping, warm_up
+from feed import ChangeFeed
+from idempotency import IdempotencyStore, TTLCache, content_hash
+from logs import RequestContextMiddleware, configure_logging, parse_sample_rates
+from metrics import (CallbackGauge, MetricsMiddleware, MongoCommandMetrics, StartupReport,
+                     TimedRoute, render_metrics)
+from notifications import FakeSMTPTransport, NotificationDispatcher, SMTPTransport
+from portfolio import PortfolioCache
+from ratelimit import MemoryTokenBucket, MongoTokenBucket, RateLimitMiddleware, client_ip
+from rollups import ContactStatsRollup, LateBuckets, StatusRollup, floor_day, floor_hour
+from search import InvertedIndex
+from settings import settings
+from write_behind import WriteBehindFull, WriteBehindQueue
+from pydantic import AfterValidator, BaseModel, Field, TypeAdapter, ValidationError, WithJsonSchema
+from pydantic.networks import validate_email
+from typing import Annotated, List, Literal, Optional
+import base64
+import hashlib
+import json
+import orjson
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 
 ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, created on first use rather than at import
+pool_stats = PoolStats()
+
+def connect_database():
+    client = create_client(settings.MONGO_URL, listeners=[pool_stats, MongoCommandMetrics()])
+    return client[settings.DB_NAME]
+
+db = LazyDatabase(connect_database)
 
-# Create the main app without a prefix
-app = FastAPI()
+startup_report = StartupReport(IMPORT_STARTED)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    connected = await warm_up(db.client, settings.MONGO_WARMUP_CONNECTIONS)
+    if connected:
+        await seed_portfolio()
+    background_tasks.add(asyncio.create_task(bootstrap_database(connected)))
+    start_portfolio_cache()
+    await start_notifications()
+    await start_write_behind()
+    start_rollups()
+    start_contact_feed()
+    start_search_index()
+    startup_report.record("startup", time.perf_counter() - started)
+    yield
+    await stop_background_tasks()
+    await stop_notifications()
+    # Drain queued writes before the client goes away
+    await drain_write_behind()
+    shutdown_db_client()
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", route_class=TimedRoute)
 
 
 # Define Models
@@ -36,19 +86,25 @@ class StatusCheckCreate(BaseModel):
     client_name: str
 
 # Contact Form Models
+# EmailStr imports email-validator with the model; this defers it to the first submission
+Email = Annotated[str, AfterValidator(lambda value: validate_email(value)[1]),
+                  WithJsonSchema({"type": "string", "format": "email"})]
+
 class ContactSubmission(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
-    email: EmailStr
+    email: Email
     message: str
     submittedAt: datetime = Field(default_factory=datetime.utcnow)
     status: str = Field(default="new")
     ipAddress: Optional[str] = None
     userAgent: Optional[str] = None
 
+ContactStatus = Literal["new", "read", "replied"]
+
 class ContactSubmissionCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
-    email: EmailStr
+    email: Email
     message: str = Field(..., min_length=10, max_length=1000)
 
 class ContactResponse(BaseModel):
@@ -56,6 +112,48 @@ class ContactResponse(BaseModel):
     message: str
     id: Optional[str] = None
 
+# Write path: synchronous insert_one by default, optional write-behind batching
+WRITE_BEHIND_COLLECTIONS = ("status_checks", "contact_submissions")
+write_queues = {}
+
+async def insert_document(collection: str, doc: dict):
+    """Persist `doc`, or queue it for the next batched flush in write-behind mode."""
+    queue = write_queues.get(collection)
+    if queue is None:
+        await db[collection].insert_one(doc)
+        return
+    try:
+        await queue.put(doc)
+    except WriteBehindFull:
+        raise HTTPException(status_code=503, detail="Server busy, please retry",
+                            headers={"Retry-After": "1"})
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against `etag` (RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque
+               for candidate in if_none_match.split(","))
+
+# Email notifications for contact submissions, delivered in the background
+notifier = None
+
+def build_mail_transport():
+    if settings.NOTIFY_TRANSPORT == "smtp":
+        return SMTPTransport(
+            host=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USERNAME,
+            password=settings.SMTP_PASSWORD,
+            starttls=settings.SMTP_STARTTLS,
+        )
+    if settings.NOTIFY_TRANSPORT == "fake":
+        return FakeSMTPTransport()
+    return None
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
@@ -63,73 +161,1033 @@ async def root():
 
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
+    # `input` is already validated; model_construct only fills in id/timestamp
+    status_doc = StatusCheck.model_construct(client_name=input.client_name).model_dump()
+    body = orjson.dumps(status_doc)
+    await insert_document("status_checks", status_doc)
+    status_counts.record_insert(status_doc)
+    return Response(content=body, media_type="application/json")
+
+# Batch ingestion for agents that report many heartbeats at once
+status_batch_adapter = TypeAdapter(List[StatusCheckCreate])
+
+async def read_body_limited(request: Request, max_bytes: int, detail: str) -> bytes:
+    """Read the request body, answering 413 as soon as it is known to exceed `max_bytes`."""
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(status_code=413, detail=detail)
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise HTTPException(status_code=413, detail=detail)
+    return bytes(body)
+
+def parse_status_batch(body: bytes, ndjson: bool):
+    """Decode a JSON array or NDJSON body into (items, {index: error}) for unparseable lines."""
+    if not ndjson:
+        try:
+            items = orjson.loads(body)
+        except orjson.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of status checks")
+        return items, {}
+    items, errors = [], {}
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(orjson.loads(line))
+        except orjson.JSONDecodeError as e:
+            errors[len(items)] = f"invalid JSON: {e}"
+            items.append(None)
+    return items, errors
+
+@api_router.post("/status/batch")
+async def create_status_checks_batch(request: Request):
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    too_large = f"At most {settings.STATUS_BATCH_MAX} status checks per batch"
+    body = await read_body_limited(request, settings.STATUS_BATCH_MAX_BYTES, too_large)
+    items, errors = parse_status_batch(body, ndjson)
+    if len(items) > settings.STATUS_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=too_large)
+
+    # One validation pass for the whole batch; only a failing batch is revalidated without its bad items
+    candidates = [i for i in range(len(items)) if i not in errors]
+    try:
+        validated = status_batch_adapter.validate_python([items[i] for i in candidates])
+    except ValidationError as e:
+        for error in e.errors():
+            index = candidates[error["loc"][0]]
+            field = ".".join(map(str, error["loc"][1:]))
+            errors.setdefault(index, f"{field}: {error['msg']}" if field else error["msg"])
+        candidates = [i for i in candidates if i not in errors]
+        validated = status_batch_adapter.validate_python([items[i] for i in candidates])
+
+    # Checks in one batch arrive together, so they share a timestamp
+    now = datetime.utcnow()
+    docs = [{"id": str(uuid.uuid4()), "client_name": check.client_name, "timestamp": now}
+            for check in validated]
+    failed_writes = set()
+    if docs:
+        try:
+            await db.status_checks.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed_writes.add(write_error["index"])
+                errors[candidates[write_error["index"]]] = write_error.get("errmsg", "write failed")
+
+    results = [None] * len(items)
+    for position, (index, doc) in enumerate(zip(candidates, docs)):
+        if position not in failed_writes:
+            results[index] = {"id": doc["id"]}
+            status_counts.record_insert(doc)
+    for index, message in errors.items():
+        results[index] = {"error": message}
+    return ORJSONResponse({"inserted": len(docs) - len(failed_writes), "failed": len(errors),
+                           "results": results})
+
+# Keyset pagination helpers
+STATUS_PAGE_DEFAULT = 100
+STATUS_PAGE_MAX = 1000
+STREAM_BATCH_SIZE = 500
+STATUS_CHECK_PROJECTION = {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1}
+
+def encode_cursor(timestamp: datetime, doc_id: str) -> str:
+    """Encode a (timestamp, id) sort key as an opaque URL-safe cursor."""
+    raw = f"{timestamp.isoformat()}|{doc_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Decode a cursor produced by `encode_cursor` back into (timestamp, id)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, doc_id = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), doc_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def keyset_filter(field: str, cursor: str, descending: bool = False) -> dict:
+    """Match documents strictly after `cursor` in (field, id) order."""
+    timestamp, doc_id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    return {"$or": [{field: {op: timestamp}}, {field: timestamp, "id": {op: doc_id}}]}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+async def stream_ndjson(cursor):
+    """Yield one JSON line per document as the Motor cursor produces them."""
+    async for doc in cursor:
+        yield orjson.dumps(doc) + b"\n"
+
+def as_utc_naive(value: datetime) -> datetime:
+    """Normalise a datetime to the naive UTC form Mongo hands back."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _query_matches(query: dict, doc: dict) -> bool:
+    """Evaluate the equality/$gte/$lt subset of a Mongo filter against a document."""
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if value is None:
+                return False
+            if "$gte" in condition and not value >= condition["$gte"]:
+                return False
+            if "$lt" in condition and not value < condition["$lt"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+class CountCache:
+    """Short-lived cache of per-filter document counts for one collection.
+
+    The unfiltered total comes from collection metadata via
+    `estimated_document_count`; filtered totals use `count_documents`. Inserts
+    made by this process bump every cached count whose filter matches, so the
+    totals stay current between TTL refreshes without re-reading rows. At most
+    `max_size` filters are kept (least recently used go first), which also
+    bounds the work each insert does.
+    """
+
+    def __init__(self, collection_name: str, ttl: float, max_size: int = 256):
+        self.collection_name = collection_name
+        self.ttl = ttl
+        self.max_size = max_size
+        self._counts = OrderedDict()
+
+    @staticmethod
+    def _key(query: dict) -> str:
+        return json.dumps(query, sort_keys=True, default=_json_default)
+
+    async def get(self, query: dict) -> int:
+        key = self._key(query)
+        cached = self._counts.get(key)
+        now = time.monotonic()
+        if cached and now - cached[2] < self.ttl:
+            self._counts.move_to_end(key)
+            return cached[1]
+        collection = db[self.collection_name]
+        if query:
+            count = await collection.count_documents(query)
+        else:
+            count = await collection.estimated_document_count()
+        self._counts[key] = (query, count, now)
+        self._counts.move_to_end(key)
+        if len(self._counts) > self.max_size:
+            self._counts.popitem(last=False)
+        return count
+
+    def record_insert(self, doc: dict):
+        now = time.monotonic()
+        for key, (query, count, fetched_at) in list(self._counts.items()):
+            if now - fetched_at >= self.ttl:
+                del self._counts[key]
+            elif _query_matches(query, doc):
+                self._counts[key] = (query, count + 1, fetched_at)
+
+    def clear(self):
+        """Drop every cached count, e.g. after a bulk write."""
+        self._counts.clear()
+
+async def list_etag(collection: str, query: dict, sort_field: str, counts: CountCache,
+                    request: Request) -> str:
+    """Weak validator for a list response: newest (sort_field, id), match count and params.
+
+    Both lookups are cheap: the newest key comes from the sort index and the
+    count from `counts`, so an unchanged page can be answered with 304 before
+    any page data is read.
+    """
+    newest = await db[collection].find_one(
+        query, {"_id": 0, sort_field: 1, "id": 1}, sort=[(sort_field, DESCENDING), ("id", DESCENDING)]
+    )
+    count = await counts.get(query)
+    fingerprint = orjson.dumps([newest, count, str(request.query_params)])
+    return f'W/"{hashlib.sha1(fingerprint).hexdigest()}"'
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=STATUS_PAGE_MAX),
+    after: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+):
+    query = keyset_filter("timestamp", after) if after else {}
+    cursor = db.status_checks.find(query, STATUS_CHECK_PROJECTION).sort(
+        [("timestamp", 1), ("id", 1)]
+    )
+
+    if format == "ndjson":
+        # Streaming mode walks the whole remaining range unless a limit is given
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return StreamingResponse(
+            stream_ndjson(cursor.batch_size(STREAM_BATCH_SIZE)),
+            media_type="application/x-ndjson",
+        )
+
+    etag = await list_etag("status_checks", {}, "timestamp", status_counts, request)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    limit = limit or STATUS_PAGE_DEFAULT
+    # Fetch one extra document to know whether another page exists
+    status_checks = await cursor.limit(limit + 1).to_list(limit + 1)
+    if len(status_checks) > limit:
+        status_checks = status_checks[:limit]
+        last = status_checks[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last["timestamp"], last["id"])
+    # The projection already matches StatusCheck, so serialize straight to bytes
+    return ORJSONResponse(status_checks, headers=headers)
+
+# Without `since` the summary covers this many days before `until` (or now)
+STATUS_SUMMARY_DEFAULT_DAYS = 7
+
+@api_router.get("/status/summary")
+async def get_status_summary(
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    granularity: Literal["hour", "day"] = "hour",
+):
+    query = {}
+    if client_name:
+        query["client_name"] = client_name
+    if until:
+        until = as_utc_naive(until)
+    if since:
+        since = as_utc_naive(since)
+    else:
+        since = floor_hour((until or datetime.utcnow()) - timedelta(days=STATUS_SUMMARY_DEFAULT_DAYS))
+    query["hour"] = {"$gte": since}
+    if until:
+        query["hour"]["$lt"] = until
+
+    buckets = {}
+    clients = {}
+    cursor = db.status_check_buckets.find(
+        query, {"_id": 0, "client_name": 1, "hour": 1, "count": 1, "firstSeen": 1, "lastSeen": 1}
+    ).sort([("hour", ASCENDING), ("client_name", ASCENDING)])
+    async for bucket in cursor:
+        period = bucket["hour"] if granularity == "hour" else bucket["hour"].replace(hour=0)
+        key = (bucket["client_name"], period)
+        buckets[key] = buckets.get(key, 0) + bucket["count"]
+        totals = clients.setdefault(bucket["client_name"], {
+            "client_name": bucket["client_name"], "count": 0,
+            "firstSeen": bucket["firstSeen"], "lastSeen": bucket["lastSeen"],
+        })
+        totals["count"] += bucket["count"]
+        totals["firstSeen"] = min(totals["firstSeen"], bucket["firstSeen"])
+        totals["lastSeen"] = max(totals["lastSeen"], bucket["lastSeen"])
+
+    return ORJSONResponse({
+        "granularity": granularity,
+        "since": since,
+        "rolledUpTo": await status_rollup.watermark(),
+        "clients": list(clients.values()),
+        "buckets": [{"client_name": name, "period": period, "count": count}
+                    for (name, period), count in buckets.items()],
+    })
+
+@api_router.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+@api_router.get("/readyz")
+async def readyz():
+    try:
+        latency_ms = await asyncio.wait_for(
+            ping(db.client), settings.READY_PING_TIMEOUT_SECONDS
+        )
+    except (PyMongoError, asyncio.TimeoutError) as e:
+        logger.warning("Readiness check failed: %s", str(e) or type(e).__name__)
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "pool": pool_stats.snapshot()},
+        )
+    return {"status": "ready", "pingMs": round(latency_ms, 2), "pool": pool_stats.snapshot()}
+
+@api_router.get("/portfolio")
+async def get_portfolio(request: Request):
+    try:
+        body, etag = await portfolio_cache.get()
+    except PyMongoError as e:
+        logger.error("Error loading portfolio data: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if body is None:
+        raise HTTPException(status_code=404, detail="Portfolio data not found")
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # Contact Form Endpoints
+async def find_recent_duplicate(fingerprint: str) -> Optional[str]:
+    """Id of a submission with the same content inside the dedup window, if any."""
+    if settings.CONTACT_DEDUP_WINDOW_SECONDS <= 0:
+        return None
+    contact_id = recent_submissions.get(fingerprint)
+    if contact_id is None:
+        window_start = datetime.utcnow() - timedelta(seconds=settings.CONTACT_DEDUP_WINDOW_SECONDS)
+        doc = await db.contact_submissions.find_one(
+            {"contentHash": fingerprint, "submittedAt": {"$gte": window_start}}, {"_id": 0, "id": 1}
+        )
+        if doc is not None:
+            contact_id = doc["id"]
+            recent_submissions.set(fingerprint, contact_id)
+    return contact_id
+
+def contact_accepted(contact_id: str) -> ContactResponse:
+    return ContactResponse(
+        success=True,
+        message="Thank you for reaching out. I'll get back to you soon.",
+        id=contact_id
+    )
+
 @api_router.post("/contact", response_model=ContactResponse)
-async def submit_contact_form(contact_data: ContactSubmissionCreate):
+async def submit_contact_form(contact_data: ContactSubmissionCreate, request: Request,
+                              response: Response):
+    idempotency_key = request.headers.get("idempotency-key")
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be 1-255 characters")
+
     try:
+        # Retries and duplicates are answered with the original submission id
+        if idempotency_key:
+            existing_id = idempotency_store.cached(idempotency_key)
+            if existing_id is not None:
+                response.headers["Idempotent-Replayed"] = "true"
+                return contact_accepted(existing_id)
+        fingerprint = content_hash(contact_data.email, contact_data.message)
+        existing_id = await find_recent_duplicate(fingerprint)
+
         # Create contact submission object
         contact_dict = contact_data.dict()
-        contact_obj = ContactSubmission(**contact_dict)
-        
+        contact_obj = ContactSubmission.model_construct(
+            **contact_dict,
+            ipAddress=client_ip(request.scope, settings.TRUSTED_PROXY_HOPS),
+            userAgent=request.headers.get("user-agent"),
+        )
+        if idempotency_key:
+            bound_id = await idempotency_store.claim(idempotency_key, existing_id or contact_obj.id)
+            existing_id = bound_id or existing_id
+        if existing_id is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+            return contact_accepted(existing_id)
+
         # Store in MongoDB
-        result = await db.contact_submissions.insert_one(contact_obj.dict())
-        
-        if result.inserted_id:
-            # Log the submission
-            logger.info(f"Contact form submitted by {contact_data.email}")
-            
-            return ContactResponse(
-                success=True,
-                message="Thank you for reaching out. I'll get back to you soon.",
-                id=contact_obj.id
-            )
-        else:
-            raise HTTPException(status_code=500, detail="Failed to save contact submission")
-            
+        contact_doc = contact_obj.dict()
+        contact_doc["contentHash"] = fingerprint
+        if notifier is not None:
+            contact_doc["notification"] = {"state": "pending", "attempts": 0}
+        try:
+            await insert_document("contact_submissions", contact_doc)
+        except Exception:
+            if idempotency_key:
+                await idempotency_store.release(idempotency_key, contact_obj.id)
+            raise
+        recent_submissions.set(fingerprint, contact_obj.id)
+        contact_counts.record_insert(contact_doc)
+        index_for_search([contact_doc])
+        if notifier is not None:
+            notifier.enqueue(contact_doc)
+
+        # Log the submission
+        logger.info("Contact form submitted by %s", contact_data.email)
+
+        return contact_accepted(contact_obj.id)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error processing contact form: {str(e)}")
+        logger.error("Error processing contact form: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+CONTACT_PAGE_DEFAULT = 100
+CONTACT_PAGE_MAX = 500
+CONTACT_PROJECTION = {"_id": 0, **{field: 1 for field in ContactSubmission.model_fields}}
+
 @api_router.get("/admin/contacts")
-async def get_contact_submissions():
+async def get_contact_submissions(
+    request: Request,
+    limit: int = Query(CONTACT_PAGE_DEFAULT, ge=1, le=CONTACT_PAGE_MAX),
+    after: Optional[str] = None,
+    status: Optional[ContactStatus] = None,
+    email: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    query = {}
+    if status:
+        query["status"] = status
+    if email:
+        query["email"] = email
+    if since or until:
+        query["submittedAt"] = {}
+        if since:
+            query["submittedAt"]["$gte"] = as_utc_naive(since)
+        if until:
+            query["submittedAt"]["$lt"] = as_utc_naive(until)
+    page_query = query
+    if after:
+        page_query = {"$and": [query, keyset_filter("submittedAt", after, descending=True)]}
+
     try:
-        contacts = await db.contact_submissions.find().sort("submittedAt", -1).to_list(100)
-        return {
-            "contacts": [ContactSubmission(**contact) for contact in contacts],
-            "total": len(contacts)
-        }
+        etag = await list_etag("contact_submissions", query, "submittedAt", contact_counts, request)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        contacts = await db.contact_submissions.find(page_query, CONTACT_PROJECTION).sort(
+            [("submittedAt", DESCENDING), ("id", DESCENDING)]
+        ).limit(limit + 1).to_list(limit + 1)
+        next_cursor = None
+        if len(contacts) > limit:
+            contacts = contacts[:limit]
+            next_cursor = encode_cursor(contacts[-1]["submittedAt"], contacts[-1]["id"])
+        return ORJSONResponse({
+            "contacts": contacts,
+            "total": await contact_counts.get(query),
+            "nextCursor": next_cursor
+        }, headers=headers)
     except Exception as e:
-        logger.error(f"Error fetching contact submissions: {str(e)}")
+        logger.error("Error fetching contact submissions: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
-# Include the router in the main app
-app.include_router(api_router)
+@api_router.get("/admin/contacts/stats")
+async def get_contact_stats(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    domains: int = Query(20, ge=1, le=500),
+):
+    query = {}
+    if since or until:
+        query["_id"] = {}
+        if since:
+            query["_id"]["$gte"] = floor_day(as_utc_naive(since))
+        if until:
+            query["_id"]["$lt"] = as_utc_naive(until)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    total = 0
+    days = []
+    by_status = {}
+    by_domain = {}
+    async for day in db.contact_stats_daily.find(query).sort("_id", ASCENDING):
+        total += day["total"]
+        days.append({"day": day["_id"], "count": day["total"]})
+        for entry in day["breakdown"]:
+            by_status[entry["status"]] = by_status.get(entry["status"], 0) + entry["count"]
+            by_domain[entry["domain"]] = by_domain.get(entry["domain"], 0) + entry["count"]
+
+    top_domains = sorted(by_domain.items(), key=lambda item: (-item[1], item[0]))[:domains]
+    return ORJSONResponse({
+        "rolledUpTo": await contact_stats.watermark(),
+        "total": total,
+        "byStatus": by_status,
+        "byDomain": [{"domain": domain, "count": count} for domain, count in top_domains],
+        "days": days,
+    })
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Full-text search: a MongoDB text index, or an in-process inverted index
+CONTACT_SEARCH_PAGE_MAX = 100
+# Each worker has its own index, so it periodically picks up inserts made by the others
+CONTACT_SEARCH_SYNC_LOOKBACK = timedelta(seconds=30)
+SEARCH_PROJECTION = {"_id": 1, "id": 1, "name": 1, "email": 1, "message": 1}
+
+def index_for_search(docs):
+    if contact_search_index is not None:
+        for doc in docs:
+            contact_search_index.add(doc)
+
+def encode_search_cursor(score: float, doc_id: str) -> str:
+    raw = f"{score!r}|{doc_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_search_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, doc_id = raw.split("|", 1)
+        return float(score), doc_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+async def search_with_text_index(q: str, limit: int, after) -> list:
+    pipeline = [
+        {"$match": {"$text": {"$search": q}}},
+        {"$set": {"score": {"$meta": "textScore"}}},
+    ]
+    if after is not None:
+        score, doc_id = after
+        pipeline.append({"$match": {"$or": [
+            {"score": {"$lt": score}}, {"score": score, "id": {"$gt": doc_id}},
+        ]}})
+    pipeline += [
+        {"$sort": {"score": -1, "id": 1}},
+        {"$limit": limit},
+        {"$project": {**CONTACT_PROJECTION, "score": 1}},
+    ]
+    return await db.contact_submissions.aggregate(pipeline).to_list(limit)
+
+async def search_with_memory_index(q: str, limit: int, after) -> list:
+    if not contact_search_index.ready:
+        raise HTTPException(status_code=503, detail="Search index is still building",
+                            headers={"Retry-After": "5"})
+    hits = contact_search_index.search(q, limit, after)
+    docs = await db.contact_submissions.find(
+        {"id": {"$in": [doc_id for _, doc_id in hits]}}, CONTACT_PROJECTION
+    ).to_list(len(hits))
+    by_id = {doc["id"]: doc for doc in docs}
+    return [{**by_id[doc_id], "score": score} for score, doc_id in hits if doc_id in by_id]
+
+@api_router.get("/admin/contacts/search")
+async def search_contacts(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=CONTACT_SEARCH_PAGE_MAX),
+    after: Optional[str] = None,
+):
+    cursor = decode_search_cursor(after) if after else None
+    search = search_with_memory_index if contact_search_index is not None else search_with_text_index
+    try:
+        contacts = await search(q, limit + 1, cursor)
+    except PyMongoError as e:
+        logger.error("Error searching contact submissions: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    next_cursor = None
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        next_cursor = encode_search_cursor(contacts[-1]["score"], contacts[-1]["id"])
+    return ORJSONResponse({"contacts": contacts, "nextCursor": next_cursor})
+
+# Live admin feed: one change stream (or poller) per process fanned out over SSE
+def sse_event(doc: dict) -> bytes:
+    event_id = encode_cursor(doc["submittedAt"], doc["id"])
+    return b"id: " + event_id.encode() + b"\nevent: contact\ndata: " + orjson.dumps(doc) + b"\n\n"
+
+async def contact_events(queue: asyncio.Queue, last_event_id: Optional[str]):
+    """Backfill everything after `last_event_id`, then relay live inserts from `queue`."""
+    try:
+        yield b"retry: 3000\n\n"
+        last_key = None
+        if last_event_id:
+            last_key = decode_cursor(last_event_id)
+            cursor = db.contact_submissions.find(
+                keyset_filter("submittedAt", last_event_id), CONTACT_PROJECTION
+            ).sort([("submittedAt", ASCENDING), ("id", ASCENDING)]).limit(settings.CONTACT_STREAM_BACKFILL_MAX)
+            async for doc in cursor:
+                last_key = (doc["submittedAt"], doc["id"])
+                yield sse_event(doc)
+        while True:
+            try:
+                doc = await asyncio.wait_for(queue.get(), settings.CONTACT_STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if doc is None:
+                # Dropped for falling behind (or shutting down); the client reconnects and backfills
+                return
+            # Inserts that arrived while backfilling were already sent
+            if last_key is not None and (doc["submittedAt"], doc["id"]) <= last_key:
+                continue
+            yield sse_event(doc)
+    finally:
+        contact_feed.unsubscribe(queue)
+
+@api_router.get("/admin/contacts/stream")
+async def stream_contacts(last_event_id: Optional[str] = Header(None)):
+    if last_event_id:
+        decode_cursor(last_event_id)
+    # Subscribe before backfilling so nothing inserted in between is missed
+    queue = contact_feed.subscribe()
+    return StreamingResponse(
+        contact_events(queue, last_event_id), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Bulk export/import: streamed in both directions so memory stays flat for any size
+BulkFormat = Literal["ndjson", "csv"]
+
+def export_response(collection: str, model, sort_field: str, format: BulkFormat):
+    fields = list(model.model_fields)
+    cursor = db[collection].find({}, {"_id": 0, **{field: 1 for field in fields}}).sort(
+        [(sort_field, ASCENDING), ("id", ASCENDING)]
+    ).batch_size(settings.EXPORT_BATCH_SIZE)
+    if format == "csv":
+        body, media_type = export_csv(cursor, fields), "text/csv"
+    else:
+        body, media_type = export_ndjson(cursor), "application/x-ndjson"
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{collection}.{format}"'
+    })
+
+async def import_stream(request: Request, collection: str, model, format: BulkFormat,
+                        prepare=None, on_inserted=None) -> dict:
+    records = iter_csv(request.stream()) if format == "csv" else iter_ndjson(request.stream())
+    importer = BulkImporter(db[collection], model, settings.IMPORT_BATCH_SIZE, prepare, on_inserted)
+    try:
+        return await importer.run(records)
+    except PyMongoError as e:
+        logger.error("Bulk import into %s failed: %s", collection, e)
+        report = importer.report()
+        raise HTTPException(status_code=500, detail={"error": "Import interrupted", **report})
+
+def prepare_imported_contact(doc: dict):
+    doc["contentHash"] = content_hash(doc["email"], doc["message"])
+    # Exports write naive UTC; other sources may carry offsets
+    doc["submittedAt"] = as_utc_naive(doc["submittedAt"])
+
+def prepare_imported_status_check(doc: dict):
+    doc["timestamp"] = as_utc_naive(doc["timestamp"])
+    # The TTL index would delete these within a minute, before any rollup counts them
+    retention_days = settings.STATUS_RETENTION_DAYS
+    if retention_days > 0 and doc["timestamp"] < datetime.utcnow() - timedelta(days=retention_days):
+        raise ValueError(f"timestamp: older than the {retention_days:g}-day retention period")
+
+@api_router.get("/admin/contacts/export")
+async def export_contacts(format: BulkFormat = "ndjson"):
+    return export_response("contact_submissions", ContactSubmission, "submittedAt", format)
+
+@api_router.post("/admin/contacts/import")
+async def import_contacts(request: Request, format: BulkFormat = "ndjson"):
+    earliest = []
+
+    def on_inserted(docs):
+        index_for_search(docs)
+        earliest.append(min(doc["submittedAt"] for doc in docs))
+
+    try:
+        return await import_stream(request, "contact_submissions", ContactSubmission, format,
+                                   prepare_imported_contact, on_inserted)
+    finally:
+        contact_counts.clear()
+        if earliest:
+            # Imported history lands behind the stats watermark; recompute from its first day
+            await contact_stats.rewind(min(earliest))
+
+@api_router.get("/admin/status/export")
+async def export_status_checks(format: BulkFormat = "ndjson"):
+    return export_response("status_checks", StatusCheck, "timestamp", format)
+
+@api_router.post("/admin/status/import")
+async def import_status_checks(request: Request, format: BulkFormat = "ndjson"):
+    watermark = await status_rollup.watermark()
+    late = LateBuckets(watermark)
+    earliest = []
+
+    def on_inserted(docs):
+        late.add(docs)
+        earliest.append(min(doc["timestamp"] for doc in docs))
+
+    try:
+        return await import_stream(request, "status_checks", StatusCheck, format,
+                                   prepare_imported_status_check, on_inserted)
+    finally:
+        status_counts.clear()
+        if earliest:
+            try:
+                await status_rollup.add_late(late)
+                # Hours the rollup passed while the import ran may have missed its rows
+                await status_rollup.refresh(max(watermark or datetime.min, floor_hour(min(earliest))))
+            except PyMongoError as e:
+                logger.error("Rolling up imported status checks failed: %s", e)
+
+# Prometheus-style metrics
+CallbackGauge(
+    "mongodb_pool_connections", "MongoDB connection pool statistics.", ("stat",),
+    lambda: {(stat,): value for stat, value in pool_stats.snapshot().items()},
 )
+
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# Rate limiting for the contact form: per-IP and per-email token buckets
+def build_rate_limiter(prefix: str):
+    capacity = getattr(settings, f'RATE_LIMIT_{prefix}_BURST')
+    refill_per_second = getattr(settings, f'RATE_LIMIT_{prefix}_PER_MINUTE') / 60
+    if settings.RATE_LIMIT_BACKEND == "mongo":
+        return MongoTokenBucket(db.rate_limits, capacity, refill_per_second)
+    return MemoryTokenBucket(capacity, refill_per_second, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+# Services that depend on settings, built with the app rather than at import
+portfolio_cache = None
+contact_counts = status_counts = None
+status_rollup = contact_stats = None
+idempotency_store = recent_submissions = None
+contact_search_index = None
+contact_feed = None
+
+def build_services():
+    global portfolio_cache, contact_counts, status_counts, status_rollup, contact_stats
+    global idempotency_store, recent_submissions, contact_search_index, contact_feed
+    if portfolio_cache is not None:
+        return
+    portfolio_cache = PortfolioCache(db.portfolio_data, settings.PORTFOLIO_CACHE_SECONDS)
+    contact_counts = CountCache("contact_submissions", settings.CONTACT_COUNT_TTL_SECONDS)
+    status_counts = CountCache("status_checks", settings.STATUS_COUNT_TTL_SECONDS)
+    # Retention: raw status checks expire via TTL after being compacted into hourly buckets
+    status_rollup = StatusRollup(db, interval=settings.STATUS_ROLLUP_INTERVAL_SECONDS,
+                                 grace=settings.STATUS_ROLLUP_GRACE_SECONDS)
+    # Analytics: per-day rollup documents, refreshed incrementally from a submittedAt watermark
+    contact_stats = ContactStatsRollup(db, interval=settings.CONTACT_STATS_INTERVAL_SECONDS,
+                                       grace=settings.CONTACT_STATS_GRACE_SECONDS)
+    # Duplicate suppression for contact submissions
+    idempotency_store = IdempotencyStore(db.idempotency_keys, settings.IDEMPOTENCY_TTL_SECONDS,
+                                         cache_size=settings.IDEMPOTENCY_CACHE_SIZE)
+    recent_submissions = TTLCache(settings.IDEMPOTENCY_CACHE_SIZE,
+                                  settings.CONTACT_DEDUP_WINDOW_SECONDS)
+    if settings.CONTACT_SEARCH_BACKEND == "memory":
+        contact_search_index = InvertedIndex()
+    contact_feed = ChangeFeed(db.contact_submissions, ContactSubmission.model_fields, "submittedAt",
+                              poll_interval=settings.CONTACT_STREAM_POLL_SECONDS)
+
+def create_app() -> FastAPI:
+    """Build the ASGI app. Settings are read here; the MongoDB client is created on first use."""
+    # Records are queued and written by a background thread
+    configure_logging(
+        level=settings.LOG_LEVEL,
+        fmt=settings.LOG_FORMAT,
+        sample_rates=parse_sample_rates(settings.LOG_SAMPLE_RATES),
+        queue_size=settings.LOG_QUEUE_SIZE,
+    )
+    build_services()
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(api_router)
+    app.add_api_route("/metrics", metrics, include_in_schema=False)
+
+    if settings.RATE_LIMIT_BACKEND != "off":
+        app.add_middleware(
+            RateLimitMiddleware,
+            ip_limiter=build_rate_limiter("IP"),
+            email_limiter=build_rate_limiter("EMAIL"),
+            routes={("POST", "/api/contact")},
+            trusted_hops=settings.TRUSTED_PROXY_HOPS,
+        )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=settings.CORS_ORIGINS.split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_BYTES,
+    )
+
+    # Outermost, so recorded latency covers every other middleware
+    app.add_middleware(
+        MetricsMiddleware,
+        slow_ms=settings.SLOW_REQUEST_MS,
+        slow_sample_rate=settings.SLOW_REQUEST_SAMPLE_RATE,
+        startup_report=startup_report,
+    )
+    # Outside the metrics layer so its request id is set for every log record
+    app.add_middleware(RequestContextMiddleware)
+    return app
+
+def __getattr__(name):
+    # Keeps `uvicorn server:app` working; the app is only built when asked for
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+# Indexes backing the list/sort queries above, created idempotently at startup
+def build_indexes() -> dict:
+    indexes = {
+        "status_checks": [
+            IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+            IndexModel([("timestamp", ASCENDING), ("id", ASCENDING)], name="timestamp_id"),
+        ],
+        "status_check_buckets": [
+            IndexModel([("hour", ASCENDING)], name="hour"),
+            IndexModel([("client_name", ASCENDING), ("hour", ASCENDING)], name="client_name_hour"),
+        ],
+        "rate_limits": [
+            IndexModel([("expiresAt", ASCENDING)], name="expiresAt_ttl", expireAfterSeconds=0),
+        ],
+        "contact_submissions": [
+            IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+            IndexModel([("submittedAt", DESCENDING), ("id", DESCENDING)], name="submittedAt_id"),
+            IndexModel(
+                [("status", ASCENDING), ("submittedAt", DESCENDING), ("id", DESCENDING)],
+                name="status_submittedAt_id",
+            ),
+            IndexModel([("email", ASCENDING), ("submittedAt", DESCENDING)], name="email_submittedAt"),
+            IndexModel([("notification.state", ASCENDING)], name="notification_state", sparse=True),
+            IndexModel([("contentHash", ASCENDING), ("submittedAt", DESCENDING)], name="contentHash_submittedAt"),
+        ],
+        "idempotency_keys": [
+            IndexModel([("createdAt", ASCENDING)], name="createdAt_ttl",
+                       expireAfterSeconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        ],
+    }
+
+    if settings.STATUS_RETENTION_DAYS > 0:
+        indexes["status_checks"].append(IndexModel(
+            [("timestamp", ASCENDING)], name="timestamp_ttl",
+            expireAfterSeconds=int(settings.STATUS_RETENTION_DAYS * 86400),
+        ))
+    if settings.CONTACT_SEARCH_BACKEND == "text":
+        indexes["contact_submissions"].append(IndexModel(
+            [("name", TEXT), ("email", TEXT), ("message", TEXT)], name="contact_text",
+        ))
+    return indexes
+
+# Hot queries whose plans are checked after the indexes exist: (collection, filter, sort)
+QUERY_PLAN_CHECKS = [
+    ("status_checks", {}, [("timestamp", ASCENDING), ("id", ASCENDING)]),
+    ("contact_submissions", {}, [("submittedAt", DESCENDING)]),
+    ("contact_submissions", {"status": "new"}, [("submittedAt", DESCENDING)]),
+    ("contact_submissions", {"email": ""}, [("submittedAt", DESCENDING)]),
+]
+
+def _plan_stages(plan: dict):
+    """Yield every stage name in an explain() plan tree."""
+    plan = plan.get("queryPlan", plan)
+    yield plan.get("stage")
+    children = plan.get("inputStages", [])
+    if "inputStage" in plan:
+        children = [plan["inputStage"], *children]
+    for child in children:
+        yield from _plan_stages(child)
+
+async def sync_ttl_indexes(collection: str, indexes):
+    """Apply changed expireAfterSeconds settings to existing TTL indexes in place."""
+    for index in indexes:
+        if "expireAfterSeconds" in index.document:
+            await db.command({"collMod": collection, "index": {
+                "name": index.document["name"],
+                "expireAfterSeconds": index.document["expireAfterSeconds"],
+            }})
+
+async def ensure_indexes():
+    for collection, indexes in build_indexes().items():
+        started = time.perf_counter()
+        try:
+            try:
+                names = await db[collection].create_indexes(indexes)
+            except OperationFailure as e:
+                # IndexOptionsConflict: most likely a retention/TTL setting changed
+                if e.code != 85:
+                    raise
+                await sync_ttl_indexes(collection, indexes)
+                names = await db[collection].create_indexes(indexes)
+        except PyMongoError as e:
+            logger.error("Failed to create indexes on %s: %s", collection, e)
+            continue
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info("Indexes on %s ready in %.1fms: %s", collection, elapsed_ms, ', '.join(names))
+
+async def check_query_plans():
+    for collection, query, sort in QUERY_PLAN_CHECKS:
+        try:
+            explain = await db[collection].find(query).sort(sort).limit(1).explain()
+        except PyMongoError as e:
+            logger.warning("Could not explain query on %s: %s", collection, e)
+            continue
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in _plan_stages(winning_plan):
+            logger.warning("Query on %s filter=%s sort=%s falls back to COLLSCAN",
+                           collection, query, sort)
+
+async def bootstrap_database(connected: bool):
+    """Build indexes and check query plans off the startup path.
+
+    When warm-up could not reach MongoDB this waits until it answers (and
+    seeds the portfolio then), so an outage never keeps workers from serving.
+    """
+    if not connected:
+        while True:
+            await asyncio.sleep(settings.MONGO_BOOTSTRAP_RETRY_SECONDS)
+            try:
+                await ping(db.client)
+                break
+            except PyMongoError as e:
+                logger.warning("MongoDB still unreachable, bootstrap deferred: %s", e)
+        await seed_portfolio()
+    await ensure_indexes()
+    await check_query_plans()
+
+background_tasks = set()
+
+async def seed_portfolio():
+    try:
+        await portfolio_cache.seed(ROOT_DIR / 'portfolio_seed.json')
+    except PyMongoError as e:
+        logger.error("Failed to seed portfolio data: %s", e)
+    portfolio_cache.invalidate()
+
+def start_portfolio_cache():
+    background_tasks.add(asyncio.create_task(portfolio_cache.watch()))
+
+async def start_notifications():
+    global notifier
+    transport = build_mail_transport()
+    if transport is None:
+        return
+    notifier = NotificationDispatcher(
+        db.contact_submissions,
+        transport,
+        sender=settings.NOTIFY_FROM,
+        recipient=settings.NOTIFY_TO,
+        workers=settings.NOTIFY_WORKERS,
+        batch_size=settings.NOTIFY_BATCH_SIZE,
+        max_retries=settings.NOTIFY_MAX_RETRIES,
+        retry_base_delay=settings.NOTIFY_RETRY_BASE_SECONDS,
+        digest_size=settings.NOTIFY_DIGEST_SIZE,
+        digest_interval=settings.NOTIFY_DIGEST_SECONDS,
+        digest_max_wait=settings.NOTIFY_DIGEST_MAX_WAIT_SECONDS,
+    )
+    notifier.start()
+    logger.info("Contact notifications enabled via %s transport", settings.NOTIFY_TRANSPORT)
+
+def start_rollups():
+    background_tasks.add(asyncio.create_task(status_rollup.run_forever()))
+    background_tasks.add(asyncio.create_task(contact_stats.run_forever()))
+
+async def build_search_index():
+    # ObjectIds carry their insertion time, which also covers imports of old submissions
+    synced_to = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    cursor = db.contact_submissions.find({}, SEARCH_PROJECTION).batch_size(settings.EXPORT_BATCH_SIZE)
+    try:
+        async for doc in cursor:
+            contact_search_index.add(doc)
+    except PyMongoError as e:
+        logger.error("Failed to build contact search index: %s", e)
+        return
+    contact_search_index.finish_build()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info("Contact search index built in %.0fms (%s submissions)",
+                elapsed_ms, len(contact_search_index))
+    await sync_search_index(synced_to)
+
+async def sync_search_index(synced_to: datetime):
+    """Add submissions inserted since `synced_to` by any worker; `add` skips known ids."""
+    while True:
+        await asyncio.sleep(settings.CONTACT_SEARCH_SYNC_SECONDS)
+        polled_at = datetime.now(timezone.utc)
+        # The lookback absorbs clock skew between workers and writes that land late
+        since = ObjectId.from_datetime(synced_to - CONTACT_SEARCH_SYNC_LOOKBACK)
+        try:
+            async for doc in db.contact_submissions.find({"_id": {"$gte": since}}, SEARCH_PROJECTION):
+                contact_search_index.add(doc)
+        except PyMongoError as e:
+            logger.warning("Contact search index sync failed: %s", e)
+            continue
+        synced_to = polled_at
+
+def start_search_index():
+    if contact_search_index is not None:
+        background_tasks.add(asyncio.create_task(build_search_index()))
+
+def start_contact_feed():
+    background_tasks.add(asyncio.create_task(contact_feed.run()))
+
+async def start_write_behind():
+    if not settings.WRITE_BEHIND:
+        return
+    for collection in WRITE_BEHIND_COLLECTIONS:
+        queue = WriteBehindQueue(
+            db[collection],
+            batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+            flush_interval=settings.WRITE_BEHIND_FLUSH_MS,
+            max_size=settings.WRITE_BEHIND_MAX_QUEUE,
+            put_timeout=settings.WRITE_BEHIND_PUT_TIMEOUT_MS,
+        )
+        queue.start()
+        write_queues[collection] = queue
+    logger.info("Write-behind enabled for %s", ', '.join(WRITE_BEHIND_COLLECTIONS))
+
+async def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+
+async def stop_notifications():
+    global notifier
+    if notifier is not None:
+        await notifier.stop()
+        notifier = None
+
+async def drain_write_behind():
+    for collection in list(write_queues):
+        await write_queues.pop(collection).drain()
+
+def shutdown_db_client():
+    db.close()
+
+startup_report.imported()
@@ -0,0 +1,130 @@
+import os
+from pathlib import Path
+
+
+ENV_FILE = Path(__file__).parent / '.env'
+REQUIRED = object()
+
+
+def flag(value: str) -> bool:
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def milliseconds(value: str) -> float:
+    return int(value) / 1000
+
+
+def upper(value: str) -> str:
+    return value.upper()
+
+
+# Environment variable -> (default, parser). A callable default is computed from the
+# settings parsed before it; REQUIRED ones raise KeyError when read while unset.
+SETTINGS = {
+    'MONGO_URL': (REQUIRED, str),
+    'DB_NAME': (REQUIRED, str),
+    'MONGO_WARMUP_CONNECTIONS': (1, int),
+    'MONGO_BOOTSTRAP_RETRY_SECONDS': (10.0, float),
+    'READY_PING_TIMEOUT_SECONDS': (2.0, float),
+    'CORS_ORIGINS': ('*', str),
+    'COMPRESSION_MIN_BYTES': (1024, int),
+    'SLOW_REQUEST_MS': (0.0, float),
+    'SLOW_REQUEST_SAMPLE_RATE': (1.0, float),
+    'LOG_LEVEL': ('INFO', upper),
+    'LOG_FORMAT': ('json', str),
+    'LOG_SAMPLE_RATES': ('access=0.1', str),
+    'LOG_QUEUE_SIZE': (10000, int),
+    'PORTFOLIO_CACHE_SECONDS': (5.0, float),
+    'WRITE_BEHIND': (False, flag),
+    'WRITE_BEHIND_BATCH_SIZE': (100, int),
+    'WRITE_BEHIND_FLUSH_MS': (0.05, milliseconds),
+    'WRITE_BEHIND_MAX_QUEUE': (10000, int),
+    'WRITE_BEHIND_PUT_TIMEOUT_MS': (1.0, milliseconds),
+    'NOTIFY_TRANSPORT': ('none', str),
+    'NOTIFY_FROM': ('noreply@localhost', str),
+    'NOTIFY_TO': (REQUIRED, str),
+    'NOTIFY_WORKERS': (2, int),
+    'NOTIFY_BATCH_SIZE': (10, int),
+    'NOTIFY_MAX_RETRIES': (5, int),
+    'NOTIFY_RETRY_BASE_SECONDS': (2.0, float),
+    'NOTIFY_DIGEST_SIZE': (0, int),
+    'NOTIFY_DIGEST_SECONDS': (0.0, float),
+    'NOTIFY_DIGEST_MAX_WAIT_SECONDS': (3600.0, float),
+    'SMTP_HOST': (REQUIRED, str),
+    'SMTP_PORT': (587, int),
+    'SMTP_USERNAME': (None, str),
+    'SMTP_PASSWORD': (None, str),
+    'SMTP_STARTTLS': (True, flag),
+    'STATUS_BATCH_MAX': (1000, int),
+    # A heartbeat is a few dozen bytes; 1KiB each leaves room for long client names
+    'STATUS_BATCH_MAX_BYTES': (lambda values: values['STATUS_BATCH_MAX'] * 1024, int),
+    'CONTACT_COUNT_TTL_SECONDS': (30.0, float),
+    'STATUS_COUNT_TTL_SECONDS': (30.0, float),
+    'STATUS_RETENTION_DAYS': (30.0, float),
+    'STATUS_ROLLUP_INTERVAL_SECONDS': (300.0, float),
+    'STATUS_ROLLUP_GRACE_SECONDS': (60.0, float),
+    'IDEMPOTENCY_TTL_SECONDS': (86400, int),
+    'IDEMPOTENCY_CACHE_SIZE': (10000, int),
+    'CONTACT_DEDUP_WINDOW_SECONDS': (600, int),
+    'CONTACT_STATS_INTERVAL_SECONDS': (300.0, float),
+    'CONTACT_STATS_GRACE_SECONDS': (60.0, float),
+    'CONTACT_SEARCH_BACKEND': ('text', str),
+    'CONTACT_SEARCH_SYNC_SECONDS': (5.0, float),
+    'CONTACT_STREAM_BACKFILL_MAX': (1000, int),
+    'CONTACT_STREAM_HEARTBEAT_SECONDS': (15.0, float),
+    'CONTACT_STREAM_POLL_SECONDS': (1.0, float),
+    'EXPORT_BATCH_SIZE': (1000, int),
+    'IMPORT_BATCH_SIZE': (1000, int),
+    'TRUST_PROXY_HEADERS': (False, flag),
+    # Reverse proxies in front of the app; TRUST_PROXY_HEADERS=true alone means one
+    'TRUSTED_PROXY_HOPS': (lambda values: 1 if values['TRUST_PROXY_HEADERS'] else 0, int),
+    'RATE_LIMIT_BACKEND': ('memory', str),
+    'RATE_LIMIT_IP_BURST': (5.0, float),
+    'RATE_LIMIT_IP_PER_MINUTE': (2.0, float),
+    'RATE_LIMIT_EMAIL_BURST': (3.0, float),
+    'RATE_LIMIT_EMAIL_PER_MINUTE': (1.0, float),
+    'RATE_LIMIT_MAX_KEYS': (10000, int),
+}
+
+
+class Settings:
+    """Typed, read-only view of `SETTINGS`.
+
+    Nothing is read at import: the first attribute access loads `env_file`
+    (real environment variables win) and parses every setting once.
+    """
+
+    def __init__(self, environ=os.environ, env_file=ENV_FILE):
+        self._environ = environ
+        self._env_file = env_file
+        self._values = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._values is not None
+
+    def load(self):
+        if self._env_file is not None:
+            from dotenv import load_dotenv
+            load_dotenv(self._env_file)
+        values = {}
+        for name, (default, parse) in SETTINGS.items():
+            raw = self._environ.get(name)
+            if raw is not None:
+                values[name] = parse(raw)
+            else:
+                values[name] = default(values) if callable(default) else default
+        self._values = values
+
+    def __getattr__(self, name):
+        if name not in SETTINGS:
+            raise AttributeError(f"unknown setting {name!r}")
+        if self._values is None:
+            self.load()
+        value = self._values[name]
+        if value is REQUIRED:
+            raise KeyError(name)
+        return value
+
+
+settings = Settings()
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteBehindFull(Exception):
+    """Raised when a document could not be queued before the put timeout."""
+
+
+class WriteBehindQueue:
+    """Buffers inserts for one collection and flushes them with insert_many.
+
+    A batch is written as soon as `batch_size` documents are waiting or
+    `flush_interval` seconds have passed since the first one arrived. The
+    queue is bounded: once `max_size` documents are pending, `put` waits up to
+    `put_timeout` seconds for room and then raises `WriteBehindFull`.
+    """
+
+    def __init__(self, collection, batch_size=100, flush_interval=0.05,
+                 max_size=10000, put_timeout=1.0):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = asyncio.Queue(maxsize=max_size)
+        self._worker = None
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def put(self, doc: dict):
+        try:
+            await asyncio.wait_for(self._queue.put(doc), self.put_timeout)
+        except asyncio.TimeoutError:
+            raise WriteBehindFull(f"write-behind queue for {self.collection.name} is full")
+
+    async def drain(self):
+        """Flush everything queued so far and stop the worker."""
+        if self._worker is None:
+            return
+        await self._queue.put(_STOP)
+        await self._worker
+        self._worker = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    item = self._queue.get_nowait()
+                else:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch):
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            logger.error("Write-behind flush to %s rejected %s of %s documents",
+                         self.collection.name, len(errors), len(batch))
+        except PyMongoError as e:
+            logger.error("Write-behind flush to %s failed, dropped %s documents: %s",
+                         self.collection.name, len(batch), e)
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Portfolio Website Backend Load & Latency Benchmark
+Drives every /api route with configurable concurrency and reports latency
+percentiles, throughput and per-request allocation peaks as JSON.
+
+By default the app runs in-process against mongomock-motor, so no server or
+database is needed. Each scenario gets a freshly seeded, index-free mock
+database, because mongomock's inserts slow down as collections and indexes
+grow. Its in-Python storage still dominates latencies, so compare numbers
+across commits with --mongo-url (a local mongod), or --url to load a running
+uvicorn instance instead.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+STATUS_BATCH_BENCH_SIZE = 100
+
+def contact_body():
+    # Unique text per request, otherwise content dedup answers all but the first
+    return {
+        "name": "Bench User",
+        "email": "bench@example.com",
+        "message": f"Benchmark message {uuid.uuid4()} with enough characters to pass validation.",
+    }
+
+# name -> (method, path, json body, a callable returning one, or None)
+SCENARIOS = {
+    "root": ("GET", "/api/", None),
+    "healthz": ("GET", "/api/healthz", None),
+    "readyz": ("GET", "/api/readyz", None),
+    "portfolio": ("GET", "/api/portfolio", None),
+    "get_status_checks": ("GET", "/api/status?limit=1000", None),
+    "create_status_check": ("POST", "/api/status", {"client_name": "bench"}),
+    # Per-heartbeat cost is this scenario's latency divided by STATUS_BATCH_BENCH_SIZE
+    "create_status_check_batch": ("POST", "/api/status/batch",
+                                  [{"client_name": "bench"}] * STATUS_BATCH_BENCH_SIZE),
+    "submit_contact_form": ("POST", "/api/contact", contact_body),
+    "get_contact_submissions": ("GET", "/api/admin/contacts", None),
+}
+
+# Metrics compared by --compare; True means higher is better
+COMPARED_METRICS = {"p50Ms": False, "p95Ms": False, "p99Ms": False, "requestsPerSecond": True}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def seed_database(db, status_checks, contacts):
+    now = datetime.utcnow()
+    if status_checks:
+        await db.status_checks.insert_many([
+            {"id": str(uuid.uuid4()), "client_name": f"client-{i % 20}",
+             "timestamp": now - timedelta(seconds=status_checks - i)}
+            for i in range(status_checks)
+        ])
+    if contacts:
+        await db.contact_submissions.insert_many([
+            {"id": str(uuid.uuid4()), "name": f"Sender {i}", "email": f"sender{i}@example.com",
+             "message": "Seeded benchmark message " * 10, "status": "new",
+             "submittedAt": now - timedelta(seconds=contacts - i),
+             "ipAddress": None, "userAgent": None}
+            for i in range(contacts)
+        ])
+
+
+def load_app(args):
+    """Import backend/server.py configured for an in-process run."""
+    os.environ.setdefault("MONGO_URL", args.mongo_url or "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "portfolio_bench")
+    # The bench hammers POST /api/contact from one address
+    os.environ["RATE_LIMIT_BACKEND"] = "off"
+    sys.path.insert(0, str(BACKEND_DIR))
+    import server
+    return server
+
+
+async def start_in_process(args, stack):
+    server = load_app(args)
+    # Building the app also builds the services the offline reset below touches
+    app = server.app
+    if args.mongo_url:
+        await server.db.client.drop_database(server.db.name)
+        await stack.enter_async_context(app.router.lifespan_context(app))
+        await seed_database(server.db, args.seed_status, args.seed_contacts)
+    else:
+        try:
+            import mongomock_motor  # noqa: F401
+        except ImportError:
+            sys.exit("mongomock-motor is required for offline runs (pip install mongomock-motor), "
+                     "or pass --mongo-url / --url")
+        await reset_mock_database(server, args)
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://bench")
+
+
+async def reset_mock_database(server, args):
+    """Point the app at a new, seeded mongomock database."""
+    from mongomock_motor import AsyncMongoMockClient
+    server.db.use(AsyncMongoMockClient()[os.environ["DB_NAME"]])
+    server.contact_counts.clear()
+    server.status_counts.clear()
+    # mongomock cannot explain() or watch(), so only run the steps it supports. Indexes
+    # are skipped too: it enforces TTL and unique ones by scanning every document per insert
+    await server.portfolio_cache.seed(BACKEND_DIR / "portfolio_seed.json")
+    await seed_database(server.db, args.seed_status, args.seed_contacts)
+
+
+def send(http, method, path, body):
+    return http.request(method, path, json=body() if callable(body) else body)
+
+
+async def run_scenario(http, method, path, body, total, concurrency):
+    latencies = []
+    status_codes = {}
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await send(http, method, path, body)
+            await response.aread()
+            latencies.append((time.perf_counter() - started) * 1000)
+            code = str(response.status_code)
+            status_codes[code] = status_codes.get(code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(n for code, n in status_codes.items() if not code.startswith(("2", "3")))
+    return {
+        "requests": total,
+        "errors": errors,
+        "statusCodes": status_codes,
+        "requestsPerSecond": round(total / wall, 1),
+        "meanMs": round(statistics.fmean(latencies), 3),
+        "p50Ms": round(percentile(latencies, 50), 3),
+        "p95Ms": round(percentile(latencies, 95), 3),
+        "p99Ms": round(percentile(latencies, 99), 3),
+        "maxMs": round(latencies[-1], 3),
+    }
+
+
+async def measure_allocations(http, method, path, body, samples):
+    """Median peak of traced Python allocations while serving one request."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            response = await send(http, method, path, body)
+            await response.aread()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return round(statistics.median(peaks) / 1024, 1)
+
+
+def serialization_benchmark(model, docs, rounds):
+    """Compare the pydantic + jsonable_encoder path with orjson for one response."""
+    import orjson
+    from fastapi.encoders import jsonable_encoder
+
+    def pydantic_path():
+        return json.dumps(jsonable_encoder([model(**doc) for doc in docs])).encode()
+
+    def orjson_path():
+        return orjson.dumps(docs)
+
+    timings = {}
+    for name, render in (("pydantic", pydantic_path), ("orjson", orjson_path)):
+        render()
+        started = time.perf_counter()
+        for _ in range(rounds):
+            render()
+        timings[name] = (time.perf_counter() - started) * 1000 / rounds
+    return {
+        "documents": len(docs),
+        "pydanticMs": round(timings["pydantic"], 3),
+        "orjsonMs": round(timings["orjson"], 3),
+        "speedup": round(timings["pydantic"] / timings["orjson"], 1),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print per-metric deltas against a previous run; return the regressions."""
+    baseline = json.loads(Path(baseline_path).read_text())["scenarios"]
+    regressions = []
+    print(f"\nComparison against {baseline_path} (threshold {threshold:.0%})")
+    for name, current in results["scenarios"].items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = "REGRESSION" if worse > threshold else ""
+            print(f"  {name:26} {metric:18} {old:>10} -> {new:>10} ({change:+.1%}) {flag}")
+            if flag:
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+async def main(args):
+    selected = args.scenario or list(SCENARIOS)
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "target": args.url or ("mongod " + args.mongo_url if args.mongo_url else "mongomock"),
+            "latencyComparable": bool(args.url or args.mongo_url),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": {},
+    }
+
+    from contextlib import AsyncExitStack
+    async with AsyncExitStack() as stack:
+        if args.url:
+            http = httpx.AsyncClient(base_url=args.url.rstrip("/"), timeout=30,
+                                     limits=httpx.Limits(max_connections=args.concurrency))
+        else:
+            http = await start_in_process(args, stack)
+        await stack.enter_async_context(http)
+
+        offline = not (args.url or args.mongo_url)
+        for name in selected:
+            method, path, body = SCENARIOS[name]
+            if offline:
+                await reset_mock_database(load_app(args), args)
+            # Warm caches and connections before timing
+            for _ in range(min(10, args.requests)):
+                await (await send(http, method, path, body)).aread()
+            stats = await run_scenario(http, method, path, body, args.requests, args.concurrency)
+            if not args.url and args.alloc_samples:
+                stats["allocPeakKiB"] = await measure_allocations(
+                    http, method, path, body, args.alloc_samples)
+            results["scenarios"][name] = stats
+            print(f"{name:26} {stats['requestsPerSecond']:>9} req/s  p50 {stats['p50Ms']:>8}ms  "
+                  f"p95 {stats['p95Ms']:>8}ms  p99 {stats['p99Ms']:>8}ms  "
+                  f"errors {stats['errors']}"
+                  + (f"  alloc {stats['allocPeakKiB']}KiB" if "allocPeakKiB" in stats else ""))
+
+    if args.serialization:
+        now = datetime.utcnow()
+        docs = [{"id": str(uuid.uuid4()), "client_name": f"client-{i % 20}",
+                 "timestamp": now - timedelta(seconds=i)} for i in range(1000)]
+        results["serialization"] = stats = serialization_benchmark(
+            load_app(args).StatusCheck, docs, args.serialization)
+        print(f"\nSerializing {stats['documents']} status checks: pydantic {stats['pydanticMs']}ms, "
+              f"orjson {stats['orjsonMs']}ms ({stats['speedup']}x)")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+    if args.compare and not results["meta"]["latencyComparable"]:
+        print("\nNote: mongomock latencies mostly measure mongomock; compare with --mongo-url")
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="benchmark a running server, e.g. http://localhost:8001")
+    target.add_argument("--mongo-url", help="run in-process against this (scratch) mongod")
+    parser.add_argument("-n", "--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("-c", "--concurrency", type=int, default=20)
+    parser.add_argument("-s", "--scenario", action="append",
+                        help=f"repeatable; one of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--seed-status", type=int, default=1000,
+                        help="status checks seeded for in-process runs (per scenario offline)")
+    parser.add_argument("--seed-contacts", type=int, default=500,
+                        help="contact submissions seeded for in-process runs (per scenario offline)")
+    parser.add_argument("--alloc-samples", type=int, default=50,
+                        help="requests traced with tracemalloc per scenario (0 disables)")
+    parser.add_argument("--serialization", type=int, default=0, metavar="ROUNDS",
+                        help="also time serializing a 1000-document /api/status page "
+                             "via pydantic vs orjson, averaged over ROUNDS")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative change treated as a regression (default 0.15)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,81 @@
+"""CSV export/import round trips through export_csv and iter_csv."""
+
+import asyncio
+from datetime import datetime
+
+from bulk import export_csv, iter_csv
+
+FIELDS = ["id", "name", "email", "message", "submittedAt", "ipAddress"]
+
+
+async def as_cursor(docs):
+    for doc in docs:
+        yield doc
+
+
+async def rechunk(chunks, size):
+    """Re-split a byte stream so quoted fields straddle chunk boundaries."""
+    data = b"".join(chunks)
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def parse_csv(chunks, size=7):
+    async def run():
+        return [row async for row in iter_csv(rechunk(chunks, size))]
+    return asyncio.run(run())
+
+
+def export(docs):
+    async def run():
+        return [chunk async for chunk in export_csv(as_cursor(docs), FIELDS)]
+    return asyncio.run(run())
+
+
+def contact(i, message):
+    return {"id": f"c{i}", "name": f"Sender {i}", "email": f"s{i}@example.com",
+            "message": message, "submittedAt": datetime(2026, 1, 2, 3, 4, i), "ipAddress": None}
+
+
+def test_round_trip_preserves_commas_quotes_and_newlines():
+    messages = [
+        "plain",
+        "commas, everywhere, really",
+        'she said "hi" and left',
+        "first line\nsecond line\n\nfourth line",
+        '"quoted, with comma"\nand a "newline"',
+        'ends with a quote"',
+    ]
+    docs = [contact(i, message) for i, message in enumerate(messages)]
+
+    rows = parse_csv(export(docs))
+
+    assert [error for _, _, error in rows] == [None] * len(docs)
+    for (_, record, _), doc in zip(rows, docs):
+        # Empty cells are dropped so model defaults apply; datetimes come back as ISO strings
+        expected = {k: v for k, v in doc.items() if v is not None}
+        expected["submittedAt"] = doc["submittedAt"].isoformat()
+        assert record == expected
+    # Each record is reported at the line it starts on, counting the header as line 1
+    line_numbers = [line_no for line_no, _, _ in rows]
+    assert line_numbers == [2, 3, 4, 5, 9, 11]
+
+
+def test_unterminated_quoted_field_is_reported_once_at_its_first_line():
+    body = b'id,message\nc0,fine\nc1,"opened\nand never closed\nc2,swallowed\n'
+
+    rows = parse_csv([body], size=5)
+
+    assert rows == [
+        (2, {"id": "c0", "message": "fine"}, None),
+        (3, None, "unterminated quoted field"),
+    ]
+
+
+def test_column_count_mismatch_is_a_row_error():
+    rows = parse_csv([b"id,message\nc0,one,extra\nc1,two\n"])
+
+    assert rows == [
+        (2, None, "expected 2 columns, got 3"),
+        (3, {"id": "c1", "message": "two"}, None),
+    ]
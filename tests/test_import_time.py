@@ -0,0 +1,67 @@
+"""Cold-start guard: importing backend/server.py must stay cheap and side-effect free."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+# Generous for CI noise; a typical import measures ~0.5s, nearly all of it fastapi and pymongo
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", "1500"))
+# .env is read with the settings, and the server runners are only needed by the launcher
+UNWANTED_MODULES = ("dotenv", "uvicorn", "gunicorn")
+
+
+def import_server(code: str = "", before: str = "") -> subprocess.CompletedProcess:
+    env = {**os.environ, "MONGO_URL": "mongodb://db.invalid:27017", "DB_NAME": "import_time"}
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{before}import server\n{code}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+
+
+def cumulative_ms(importtime_log: str, module: str) -> float:
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1000
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def test_server_import_within_budget():
+    for dependency in ("fastapi", "motor", "orjson"):
+        pytest.importorskip(dependency)
+    # The first run warms the bytecode cache so only import work is measured
+    import_server()
+    result = import_server()
+    assert result.returncode == 0, result.stderr
+    elapsed = cumulative_ms(result.stderr, "server")
+    assert elapsed < IMPORT_BUDGET_MS, f"importing server took {elapsed:.0f}ms"
+
+
+def test_server_import_is_lazy():
+    pytest.importorskip("fastapi")
+    result = import_server(
+        "import sys, threading\n"
+        "assert not server.db.connected, 'MongoDB client created at import'\n"
+        "assert 'app' not in vars(server), 'app built at import'\n"
+        "assert not server.settings.loaded, 'settings read at import'\n"
+        "assert threading.active_count() == 1, threading.enumerate()\n"
+        f"loaded = [m for m in {UNWANTED_MODULES!r} if m in sys.modules]\n"
+        "assert not loaded, loaded\n"
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_email_validation_deferred():
+    pytest.importorskip("fastapi")
+    # FastAPI imports email-validator itself when installed, so block it to see whether server needs it
+    result = import_server(
+        "models = [server.ContactSubmission, server.ContactSubmissionCreate]\n",
+        before="import sys\nsys.modules['email_validator'] = None\n",
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,108 @@
+"""NotificationDispatcher batching, retries and delivery state, against FakeSMTPTransport."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+from notifications import FakeSMTPTransport, NotificationDispatcher  # noqa: E402
+
+
+def make_dispatcher(transport=None, **options):
+    collection = mongomock_motor.AsyncMongoMockClient()["notifications_test"].contact_submissions
+    options.setdefault("retry_base_delay", 0.001)
+    return NotificationDispatcher(collection, transport or FakeSMTPTransport(),
+                                  "noreply@example.com", "owner@example.com", **options)
+
+
+def contact(i):
+    return {"id": f"c{i}", "name": f"Sender {i}", "email": f"s{i}@example.com",
+            "message": "Hello there, nice portfolio", "submittedAt": datetime(2026, 1, 1, 12, i),
+            "notification": {"state": "pending", "attempts": 0}}
+
+
+async def trickle(dispatcher, count, gap):
+    for i in range(count):
+        dispatcher.enqueue({"id": f"c{i}"})
+        await asyncio.sleep(gap)
+
+
+def next_batch_while_trickling(dispatcher, count, gap):
+    async def run():
+        producer = asyncio.create_task(trickle(dispatcher, count, gap))
+        batch = await dispatcher._next_batch()
+        await producer
+        return batch
+    return asyncio.run(run())
+
+
+def test_plain_mode_sends_what_is_queued():
+    dispatcher = make_dispatcher(batch_size=10)
+    assert next_batch_while_trickling(dispatcher, 3, 0.01) == ["c0"]
+
+
+def test_interval_only_digest_collects_everything_in_the_window():
+    dispatcher = make_dispatcher(digest_interval=0.2)
+    assert next_batch_while_trickling(dispatcher, 5, 0.01) == [f"c{i}" for i in range(5)]
+
+
+def test_size_only_digest_waits_for_n_items():
+    dispatcher = make_dispatcher(digest_size=4)
+    assert next_batch_while_trickling(dispatcher, 6, 0.02) == [f"c{i}" for i in range(4)]
+
+
+def test_size_only_digest_flushes_partial_batch_after_max_wait():
+    dispatcher = make_dispatcher(digest_size=10, digest_max_wait=0.1)
+    assert next_batch_while_trickling(dispatcher, 2, 0.01) == ["c0", "c1"]
+
+
+def deliver(dispatcher, contacts):
+    async def run():
+        await dispatcher.collection.insert_many(contacts)
+        claimed = await dispatcher._claim([c["id"] for c in contacts])
+        await dispatcher._deliver(claimed)
+        return await dispatcher.collection.find({}, {"_id": 0}).sort("id", 1).to_list(None)
+    return asyncio.run(run())
+
+
+def test_retries_with_backoff_then_records_sent():
+    transport = FakeSMTPTransport(fail_next=2)
+    docs = deliver(make_dispatcher(transport, max_retries=5), [contact(0), contact(1)])
+    assert len(transport.outbox) == 2
+    assert transport.outbox[0]["Reply-To"] == "s0@example.com"
+    for doc in docs:
+        assert doc["notification"]["state"] == "sent"
+        assert doc["notification"]["attempts"] == 3
+        assert doc["notification"]["lastError"] == "simulated SMTP failure"
+        assert isinstance(doc["notification"]["sentAt"], datetime)
+
+
+def test_gives_up_after_max_retries():
+    transport = FakeSMTPTransport(fail_next=10)
+    docs = deliver(make_dispatcher(transport, max_retries=3), [contact(0)])
+    assert transport.outbox == []
+    assert docs[0]["notification"]["state"] == "failed"
+    assert docs[0]["notification"]["attempts"] == 3
+
+
+def test_digest_sends_one_summary_message():
+    transport = FakeSMTPTransport()
+    docs = deliver(make_dispatcher(transport, digest_size=3), [contact(i) for i in range(3)])
+    assert len(transport.outbox) == 1
+    assert transport.outbox[0]["Subject"] == "3 new contact submissions"
+    assert all(doc["notification"]["state"] == "sent" for doc in docs)
+
+
+def test_claimed_submissions_are_not_claimed_twice():
+    dispatcher = make_dispatcher()
+
+    async def run():
+        await dispatcher.collection.insert_one(contact(0))
+        first = await dispatcher._claim(["c0"])
+        second = await dispatcher._claim(["c0"])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert [c["id"] for c in first] == ["c0"]
+    assert second == []
@@ -0,0 +1,132 @@
+"""InvertedIndex.search against exhaustive tf-idf scoring, plus a latency guard at 100k documents."""
+
+import math
+import os
+import random
+import statistics
+import time
+from collections import Counter
+
+import pytest
+
+from search import SEARCH_FIELDS, InvertedIndex, tokenize
+
+VOCABULARY = [f"w{i}" for i in range(60)]
+# Generous for CI noise; selective and two-term queries typically take well under 3ms
+SEARCH_BUDGET_MS = float(os.environ.get("SEARCH_BUDGET_MS", "10"))
+
+
+def random_doc(rng, i):
+    # Skewed word choice so common terms, long posting lists and score ties all occur
+    words = rng.choices(VOCABULARY, weights=[1 / (r + 1) for r in range(len(VOCABULARY))],
+                        k=rng.randint(1, 12))
+    return {"id": f"{i:06d}", "name": rng.choice(VOCABULARY), "email": f"u{i}@example.com",
+            "message": " ".join(words)}
+
+
+def term_counts(docs):
+    return {doc["id"]: Counter(tokenize(" ".join(doc[f] for f in SEARCH_FIELDS))) for doc in docs}
+
+
+def brute_force(counts, query):
+    """Score every document the way the index documents it: summed idf * tf, id ascending on ties."""
+    terms = []
+    for token in sorted(set(tokenize(query))):
+        df = sum(1 for c in counts.values() if token in c)
+        if df:
+            terms.append((token, math.log(1 + len(counts) / df)))
+    ranked = []
+    for doc_id, c in counts.items():
+        if any(token in c for token, _ in terms):
+            ranked.append((-sum(idf * c.get(token, 0) for token, idf in terms), doc_id))
+    return [(-neg_score, doc_id) for neg_score, doc_id in sorted(ranked)]
+
+
+def build(docs, live=()):
+    index = InvertedIndex()
+    for doc in docs:
+        index.add(doc)
+    index.finish_build()
+    # Documents arriving after the bulk load take the incremental insert path
+    for doc in live:
+        index.add(doc)
+    return index
+
+
+def random_queries(rng, count):
+    queries = ["w0", "w59", "w0 w1 w2 w3", "unknownword", "the and", "w5 unknownword"]
+    for _ in range(count):
+        queries.append(" ".join(rng.sample(VOCABULARY, rng.randint(1, 4))))
+    return queries
+
+
+def page_through(index, query, limit):
+    results, after = [], None
+    while True:
+        page = index.search(query, limit, after)
+        results.extend(page)
+        if len(page) < limit:
+            return results
+        after = page[-1]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_search_matches_exhaustive_ranking(seed):
+    rng = random.Random(seed)
+    docs = [random_doc(rng, i) for i in range(1500)]
+    live = [random_doc(rng, i) for i in range(1500, 1800)]
+    index, counts = build(docs, live), term_counts(docs + live)
+    for query in random_queries(rng, 25):
+        expected = brute_force(counts, query)
+        for limit in (1, 7, 50):
+            assert index.search(query, limit) == expected[:limit], (query, limit)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_paging_with_after_visits_every_match_once_in_order(seed):
+    rng = random.Random(seed)
+    docs = [random_doc(rng, i) for i in range(1000)]
+    live = [random_doc(rng, i) for i in range(1000, 1200)]
+    index, counts = build(docs, live), term_counts(docs + live)
+    for query in random_queries(rng, 10):
+        expected = brute_force(counts, query)
+        for limit in (3, 20):
+            assert page_through(index, query, limit) == expected, (query, limit)
+
+
+def test_documents_added_after_build_are_ranked():
+    index = build([{"id": "a", "name": "x", "email": "a@example.com", "message": "apple"}])
+    index.add({"id": "b", "name": "x", "email": "b@example.com", "message": "apple apple"})
+    index.add({"id": "b", "name": "x", "email": "b@example.com", "message": "ignored duplicate"})
+    assert [doc_id for _, doc_id in index.search("apple", 10)] == ["b", "a"]
+    assert index.search("ignored", 10) == []
+
+
+def test_early_stop_respects_id_order_on_score_ties():
+    # After one round "z" leads with 2 * idf, but unseen "m" ties it and sorts first
+    docs = [{"id": "z", "name": "x", "email": "", "message": "apple apple"},
+            {"id": "m", "name": "x", "email": "", "message": "apple banana"},
+            {"id": "c", "name": "x", "email": "", "message": "banana"}]
+    index = build(docs)
+    assert index.search("apple banana", 1) == brute_force(term_counts(docs), "apple banana")[:1]
+    assert index.search("apple banana", 1)[0][1] == "m"
+
+
+def test_search_latency_at_100k_documents():
+    rng = random.Random(42)
+    words = [f"term{i}" for i in range(20000)]
+    index = InvertedIndex()
+    for i in range(100_000):
+        index.add({"id": f"{i:06d}", "name": rng.choice(words), "email": f"user{i}@example.com",
+                   "message": " ".join(rng.choices(words, k=20))})
+    index.finish_build()
+
+    queries = [rng.choice(words) for _ in range(50)]
+    queries += [" ".join(rng.sample(words, 2)) for _ in range(50)]
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, 20)
+        timings.append((time.perf_counter() - started) * 1000)
+    median = statistics.median(timings)
+    assert median < SEARCH_BUDGET_MS, f"median search took {median:.2f}ms"
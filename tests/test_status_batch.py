@@ -0,0 +1,82 @@
+"""POST /api/status/batch: per-item results for mixed valid, invalid and unwritable items."""
+
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+httpx = pytest.importorskip("httpx")
+import server  # noqa: E402
+
+
+@pytest.fixture
+def database(monkeypatch):
+    db = mongomock_motor.AsyncMongoMockClient()["status_batch_test"]
+    server.db.use(db)
+    server.app  # builds the services and reads the settings
+    # Ids repeat after two, so the third valid item of a batch collides on the unique index
+    ids = itertools.cycle(["id-0", "id-1", "id-0"])
+    monkeypatch.setattr(server, "uuid", SimpleNamespace(uuid4=lambda: next(ids)))
+    asyncio.run(db.status_checks.create_index("id", unique=True))
+    return db
+
+
+def post_batch(body: bytes, content_type: str):
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/status/batch", content=body,
+                                     headers={"content-type": content_type})
+    return asyncio.run(run())
+
+
+def stored_ids(db):
+    return asyncio.run(db.status_checks.distinct("id"))
+
+
+def test_json_batch_maps_every_result_to_its_item(database):
+    body = (b'[{"client_name": "a"}, {"client_name": 5}, {}, '
+            b'{"client_name": "b"}, {"client_name": "c"}]')
+    response = post_batch(body, "application/json")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["inserted"] == 2
+    assert payload["failed"] == 3
+    results = payload["results"]
+    assert len(results) == 5
+    assert results[0] == {"id": "id-0"}
+    assert results[1]["error"].startswith("client_name: Input should be a valid string")
+    assert results[2] == {"error": "client_name: Field required"}
+    assert results[3] == {"id": "id-1"}
+    # Valid, but its insert hit the duplicate id
+    assert results[4]["error"].startswith("E11000")
+    assert sorted(stored_ids(database)) == ["id-0", "id-1"]
+
+
+def test_ndjson_batch_keeps_bad_lines_in_position(database):
+    body = b'{"client_name": "a"}\nnot json\n\n{"nope": 1}\n{"client_name": "b"}\n{"client_name": "c"}\n'
+    response = post_batch(body, "application/x-ndjson")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["inserted"] == 2
+    assert payload["failed"] == 3
+    results = payload["results"]
+    # The blank line is skipped, not counted as an item
+    assert len(results) == 5
+    assert results[0] == {"id": "id-0"}
+    assert results[1]["error"].startswith("invalid JSON")
+    assert results[2] == {"error": "client_name: Field required"}
+    assert results[3] == {"id": "id-1"}
+    assert results[4]["error"].startswith("E11000")
+
+
+def test_batch_over_the_item_limit_is_rejected(database, monkeypatch):
+    monkeypatch.setitem(server.settings._values, "STATUS_BATCH_MAX", 2)
+    response = post_batch(b'[{"client_name": "a"}, {"client_name": "b"}, {"client_name": "c"}]',
+                          "application/json")
+    assert response.status_code == 413
+    assert stored_ids(database) == []
@@ -0,0 +1,98 @@
+"""WriteBehindQueue batching, deadlines, back-pressure and draining, against mongomock."""
+
+import asyncio
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+from write_behind import WriteBehindFull, WriteBehindQueue  # noqa: E402
+
+
+class RecordingCollection:
+    """Passes inserts through to mongomock and records the size of every batch."""
+
+    def __init__(self):
+        self.collection = mongomock_motor.AsyncMongoMockClient()["write_behind_test"].status_checks
+        self.name = self.collection.name
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.batches.append(len(docs))
+        return await self.collection.insert_many(docs, ordered=ordered)
+
+    async def count(self):
+        return await self.collection.count_documents({})
+
+
+def make_queue(**options):
+    collection = RecordingCollection()
+    return WriteBehindQueue(collection, **options), collection
+
+
+async def put_all(queue, count):
+    for i in range(count):
+        await queue.put({"id": f"s{i}"})
+
+
+def test_flushes_as_soon_as_batch_size_is_waiting():
+    async def run():
+        queue, collection = make_queue(batch_size=3, flush_interval=10)
+        queue.start()
+        await put_all(queue, 7)
+        await asyncio.sleep(0.05)
+        flushed = list(collection.batches)
+        await queue.drain()
+        return flushed, collection.batches, await collection.count()
+
+    flushed, batches, stored = asyncio.run(run())
+    assert flushed == [3, 3]
+    assert batches == [3, 3, 1]
+    assert stored == 7
+
+
+def test_flushes_a_partial_batch_at_the_flush_interval_deadline():
+    async def run():
+        queue, collection = make_queue(batch_size=100, flush_interval=0.1)
+        queue.start()
+        await put_all(queue, 2)
+        await asyncio.sleep(0.03)
+        before_deadline = list(collection.batches)
+        await asyncio.sleep(0.2)
+        after_deadline = list(collection.batches)
+        await queue.drain()
+        return before_deadline, after_deadline, await collection.count()
+
+    before_deadline, after_deadline, stored = asyncio.run(run())
+    assert before_deadline == []
+    assert after_deadline == [2]
+    assert stored == 2
+
+
+def test_put_raises_write_behind_full_after_put_timeout():
+    async def run():
+        # Not started, so nothing drains the queue
+        queue, collection = make_queue(max_size=2, put_timeout=0.05)
+        await put_all(queue, 2)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        with pytest.raises(WriteBehindFull):
+            await queue.put({"id": "overflow"})
+        return loop.time() - started, collection.batches
+
+    waited, batches = asyncio.run(run())
+    assert waited >= 0.04
+    assert batches == []
+
+
+def test_drain_flushes_a_partial_batch_and_stops_the_worker():
+    async def run():
+        queue, collection = make_queue(batch_size=100, flush_interval=10)
+        queue.start()
+        await put_all(queue, 5)
+        await queue.drain()
+        return queue._worker, collection.batches, await collection.count()
+
+    worker, batches, stored = asyncio.run(run())
+    assert worker is None
+    assert batches == [5]
+    assert stored == 5